@@ -0,0 +1,71 @@
+"""
+Load test for admission control against a running Bookly server.
+
+Throttle the local database first so it becomes the bottleneck, e.g.
+    docker update --cpus 0.2 <postgres container>
+or add network latency to the database port:
+    tc qdisc add dev lo root netem delay 20ms
+
+then run, with and without ADMISSION_CONTROL_ENABLED:
+    python -m benchmarks.admission_load_test --url http://localhost:8000/api/v1/book/ \
+        --token <access token> --concurrency 300 --duration 30
+
+Without shedding, latency climbs to the pool timeout and everything fails;
+with it, excess requests get fast 503s and admitted ones keep a low p99.
+"""
+
+import argparse
+import asyncio
+import collections
+import time
+import httpx
+
+
+def percentile(values, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def worker(client: httpx.AsyncClient, args, deadline: float, latencies, statuses) -> None:
+    while time.perf_counter() < deadline:
+        start_time = time.perf_counter()
+        try:
+            response = await client.get(args.url)
+            status_code = response.status_code
+        except httpx.HTTPError as e:
+            status_code = type(e).__name__
+        latency = time.perf_counter() - start_time
+        statuses[status_code] += 1
+        latencies[status_code].append(latency)
+
+
+async def main(args) -> None:
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    latencies = collections.defaultdict(list)
+    statuses = collections.Counter()
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=args.timeout) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(*(worker(client, args, deadline, latencies, statuses)
+                               for _ in range(args.concurrency)))
+
+    total = sum(statuses.values())
+    print(f"{total} requests in {args.duration}s ({total / args.duration:,.0f} req/s)")
+    for status_code, count in statuses.most_common():
+        values = latencies[status_code]
+        print(f"  {status_code}: {count:>7}  p50 {percentile(values, 0.5) * 1000:8.1f} ms"
+              f"  p99 {percentile(values, 0.99) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Admission control load test")
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--token")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--timeout", type=float, default=60)
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,109 @@
+"""
+Rows/s for a 10k-row book list page: ORM + response_model path vs the
+ORM-free fast path in src/books/repository.py.
+
+Runs against PostgreSQL through asyncpg by default (DATABASE_URL, in a
+throwaway schema that is dropped afterwards), so rows carry asyncpg's own
+types — e.g. its UUID subclass — exactly as in production:
+
+    python -m benchmarks.list_serialization_bench --rows 10000
+
+`--database-url sqlite+aiosqlite://` (needs aiosqlite, see requirement-dev.txt)
+measures the Python side only, but hides driver-specific types.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import List
+from pydantic import TypeAdapter
+from sqlmodel import SQLModel, select, desc
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import config
+from src.db.model import Book, User, Review
+from src.books.schema import Book as BookSchema
+from src.books.repository import BookReadRepository
+
+book_list_adapter = TypeAdapter(List[BookSchema])
+
+
+async def orm_path(session: AsyncSession) -> bytes:
+    # What the endpoint did before: ORM instances -> response_model validation -> json
+    result = await session.exec(select(Book).order_by(desc(Book.created_at)))
+    books = result.all()
+    validated = book_list_adapter.validate_python([book.model_dump() for book in books])
+    return json.dumps(book_list_adapter.dump_python(validated, mode="json")).encode()
+
+
+async def fast_path(session: AsyncSession) -> bytes:
+    return await BookReadRepository().get_all_books_json(session)
+
+
+@asynccontextmanager
+async def bench_engine(url: str):
+    if not url.startswith("postgresql"):
+        engine = create_async_engine(url)
+        yield engine
+        await engine.dispose()
+        return
+
+    # Own schema, so the application's tables are never touched
+    schema = f"bench_{uuid.uuid4().hex[:8]}"
+    admin = create_async_engine(url)
+    async with admin.begin() as conn:
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+    # public stays on the path for extensions (pg_trgm operator classes)
+    engine = create_async_engine(url, connect_args={"server_settings": {"search_path": f"{schema}, public"}})
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+        async with admin.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        await admin.dispose()
+
+
+async def main(args) -> None:
+    async with bench_engine(args.database_url) as engine:
+        await run(engine, args)
+
+
+async def run(engine, args) -> None:
+    async with engine.begin() as conn:
+        # Only what this benchmark uses (SQLite has no ARRAY columns)
+        await conn.run_sync(SQLModel.metadata.create_all,
+                            tables=[User.__table__, Book.__table__, Review.__table__])
+
+    SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with SessionLocal() as session:
+        session.add_all(Book(uid=uuid.uuid4(), title=f"Book {i}", author="Author", publisher="Publisher",
+                             published_date=date(2020, 1, 1), page_count=300, language="en")
+                        for i in range(args.rows))
+        await session.commit()
+
+    for name, path in (("orm + response_model", orm_path), ("core rows + orjson", fast_path)):
+        timings = []
+        for _ in range(args.repeat):
+            # New session every run so the identity map starts empty, like a request
+            async with SessionLocal() as session:
+                start_time = time.perf_counter()
+                await path(session)
+                timings.append(time.perf_counter() - start_time)
+        best = min(timings)
+        print(f"{name:>22}: {args.rows / best:,.0f} rows/s ({best * 1000:.1f} ms per {args.rows} rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Book list serialization benchmark")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default=config.DATABASE_URL)
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,108 @@
+"""
+Review write throughput: synchronous upserts (one request = one connection
+and transaction) vs the Redis stream path (XADD in the request, batched
+INSERT ... SELECT FROM unnest in ReviewStreamWorker).
+
+Needs the real stack (PostgreSQL at DATABASE_URL, Redis at REDIS_URL, schema
+migrated). Seeds one user and `--reviews` books in the database and uses a
+separate stream, and deletes both afterwards:
+
+    python -m benchmarks.review_ingest_bench --reviews 5000 --concurrency 50
+
+"enqueue" is what the client waits for in stream mode; "durable" is until
+the worker has committed every review.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import date
+from sqlalchemy import delete
+from src.db.main import SessionLocal
+from src.db.model import Book, Review, User
+from src.db.redis import redis_manager
+from src.reviews.ingest import ReviewStreamWorker, enqueue_review
+from src.reviews.schema import ReviewCreateModel
+from src.reviews.service import ReviewService
+
+review_service = ReviewService()
+
+
+async def seed(count: int):
+    async with SessionLocal() as session:
+        user = User(uid=uuid.uuid4(), username="review-bench", email=f"bench-{uuid.uuid4()}@example.com",
+                    first_name="Bench", last_name="User", password_hash="-")
+        session.add(user)
+        books = [Book(title=f"Bench {i}", author="Author", publisher="Publisher",
+                      published_date=date(2020, 1, 1), page_count=100, language="en")
+                 for i in range(count)]
+        session.add_all(books)
+        await session.commit()
+        return user.uid, [book.uid for book in books]
+
+
+async def cleanup(user_uid, book_uids) -> None:
+    async with SessionLocal() as session:
+        await session.execute(delete(Review).where(Review.user_uid == user_uid))
+        await session.execute(delete(Book).where(Book.uid.in_(book_uids)))
+        await session.execute(delete(User).where(User.uid == user_uid))
+        await session.commit()
+
+
+async def run_limited(concurrency: int, jobs) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(job):
+        async with semaphore:
+            await job()
+
+    await asyncio.gather(*(run(job) for job in jobs))
+
+
+def report(name: str, count: int, seconds: float) -> None:
+    print(f"{name:>16}: {count} reviews in {seconds:6.2f}s  ({count / seconds:8,.0f} reviews/s)")
+
+
+async def main(args) -> None:
+    review = ReviewCreateModel(rating=4, review_text="Great read")
+    user_uid, book_uids = await seed(args.reviews)
+    stream = f"reviews:bench:{uuid.uuid4()}"
+    try:
+        async def write_sync(book_uid):
+            async with SessionLocal() as session:
+                await review_service.add_reviews_to_book(user_uid, book_uid, review, session)
+
+        start_time = time.perf_counter()
+        await run_limited(args.concurrency, [lambda b=b: write_sync(b) for b in book_uids])
+        report("sync", len(book_uids), time.perf_counter() - start_time)
+
+        async with SessionLocal() as session:
+            await session.execute(delete(Review).where(Review.user_uid == user_uid))
+            await session.commit()
+
+        worker = ReviewStreamWorker(consumer="bench", stream=stream, group="bench",
+                                    batch_size=args.batch_size)
+        await worker.ensure_group()
+        start_time = time.perf_counter()
+        await run_limited(args.concurrency,
+                          [lambda b=b: enqueue_review(str(user_uid), b, review, stream=stream) for b in book_uids])
+        report("stream enqueue", len(book_uids), time.perf_counter() - start_time)
+
+        processed = 0
+        while processed < len(book_uids):
+            processed += await worker.run_once()
+        report("stream durable", len(book_uids), time.perf_counter() - start_time)
+    finally:
+        await redis_manager.client.delete(stream)
+        await cleanup(user_uid, book_uids)
+        await redis_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync vs stream review ingestion throughput")
+    parser.add_argument("--reviews", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=500)
+
+    asyncio.run(main(parser.parse_args()))
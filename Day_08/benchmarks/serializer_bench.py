@@ -0,0 +1,73 @@
+"""
+CPU time per response for each Bookly response schema:
+FastAPI's default path (response_model validation + jsonable_encoder + json.dumps)
+vs the cached TypeAdapter dump_json path in src/responses.py.
+
+    python -m benchmarks.serializer_bench --reviews 50 --books 50
+"""
+
+import argparse
+import json
+import time
+import uuid
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from src.books.schema import Book, BookDetailModel
+from src.auth.schemas import UserBooksModel
+from src.reviews.schema import ReviweModel
+from src.responses import serializers
+
+
+def make_review():
+    return SimpleNamespace(uid=uuid.uuid4(), rating=4, review_text="A very good read " * 5,
+                           user_uid=uuid.uuid4(), book_uid=uuid.uuid4(),
+                           created_at=datetime.now(), updated_at=datetime.now())
+
+
+def make_book(reviews: int):
+    return SimpleNamespace(uid=uuid.uuid4(), title="Some Book Title", author="Some Author",
+                           publisher="Some Publisher", published_date=date(2020, 1, 1),
+                           page_count=320, language="en", created_at=datetime.now(),
+                           updated_at=datetime.now(), reviews=[make_review() for _ in range(reviews)])
+
+
+def fastapi_default(adapter: TypeAdapter, obj) -> bytes:
+    validated = adapter.validate_python(obj, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def cpu_per_call(fn, *args, repeat: int) -> float:
+    start_time = time.process_time()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.process_time() - start_time) / repeat
+
+
+def main(args) -> None:
+    serializers.build()
+    cases = [
+        ("Book", Book, make_book(0)),
+        ("List[Book]", List[Book], [make_book(0) for _ in range(args.books)]),
+        ("BookDetailModel", BookDetailModel, make_book(args.reviews)),
+        ("UserBooksModel", UserBooksModel, SimpleNamespace(books=[make_book(0) for _ in range(args.books)])),
+        ("ReviweModel", ReviweModel, make_review()),
+    ]
+
+    print(f"{'schema':>16} {'fastapi default':>16} {'cached adapter':>16} {'speedup':>8}")
+    for name, schema, obj in cases:
+        adapter = TypeAdapter(schema)
+        before = cpu_per_call(fastapi_default, adapter, obj, repeat=args.repeat)
+        after = cpu_per_call(serializers.dump_json, schema, obj, repeat=args.repeat)
+        print(f"{name:>16} {before * 1e6:>13.1f} µs {after * 1e6:>13.1f} µs {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Response serializer benchmark")
+    parser.add_argument("--books", type=int, default=50, help="books per list response")
+    parser.add_argument("--reviews", type=int, default=50, help="reviews per book detail")
+    parser.add_argument("--repeat", type=int, default=2000)
+
+    main(parser.parse_args())
@@ -0,0 +1,75 @@
+"""
+Database queries per burst of concurrent identical book detail reads,
+without and with the single-flight layer in src/singleflight.py.
+
+Uses a temporary SQLite file (needs aiosqlite) and counts statements with an
+engine hook:
+
+    python -m benchmarks.singleflight_bench --burst 200
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import date
+from src.db.model import Book, Review, User
+from src.books.schema import BookDetailModel
+from src.books.service import BookService
+from src.responses import serializers
+from src.singleflight import SingleFlight
+
+book_service = BookService()
+
+
+async def main(args) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=args.burst, max_overflow=0)
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *rest: statements.append(statement))
+
+    async with engine.begin() as conn:
+        # Only what this benchmark uses (SQLite has no ARRAY columns)
+        await conn.run_sync(SQLModel.metadata.create_all, tables=[User.__table__, Book.__table__, Review.__table__])
+
+    SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with SessionLocal() as session:
+        book = Book(title="Popular", author="Author", publisher="Publisher",
+                    published_date=date(2020, 1, 1), page_count=300, language="en")
+        session.add(book)
+        session.add_all(Review(rating=4, review_text="Great", book_uid=book.uid) for _ in range(args.reviews))
+        await session.commit()
+        book_uid = book.uid
+
+    async def load() -> bytes:
+        async with SessionLocal() as session:
+            found = await book_service.get_book(book_uid, session)
+            return serializers.dump_json(BookDetailModel, found)
+
+    flight = SingleFlight("bench")
+
+    for name, request in (("direct", load), ("single-flight", lambda: flight.do(str(book_uid), load))):
+        statements.clear()
+        start_time = time.perf_counter()
+        results = await asyncio.gather(*(request() for _ in range(args.burst)))
+        elapsed = time.perf_counter() - start_time
+        assert len(set(results)) == 1
+        print(f"{name:>14}: {len(statements):>5} queries for {args.burst} concurrent requests "
+              f"({elapsed * 1000:.0f} ms)")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Single-flight burst benchmark")
+    parser.add_argument("--burst", type=int, default=200)
+    parser.add_argument("--reviews", type=int, default=500)
+
+    asyncio.run(main(parser.parse_args()))
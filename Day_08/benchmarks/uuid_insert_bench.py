@@ -0,0 +1,67 @@
+"""
+Insert throughput and primary key index size: uuid4 vs uuid7.
+
+Creates two scratch tables shaped like `books`, loads ROWS rows into each in
+batches (uid generated in Python, like the app does) and prints rows/s, index
+size and index buffer reads. Run it against a throwaway database:
+
+    python -m benchmarks.uuid_insert_bench --rows 10000000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+import asyncpg
+from src.config import config
+from src.db.ids import uuid7
+
+GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+async def run(conn: asyncpg.Connection, name: str, rows: int, batch_size: int) -> None:
+    table = f"bench_books_{name}"
+    await conn.execute(f"DROP TABLE IF EXISTS {table}")
+    await conn.execute(f"""
+        CREATE TABLE {table} (
+            uid uuid PRIMARY KEY,
+            title varchar NOT NULL,
+            created_at timestamp NOT NULL
+        )""")
+
+    make_uid = GENERATORS[name]
+    start_time = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        now = datetime.now()
+        records = [(make_uid(), f"book {offset + i}", now) for i in range(min(batch_size, rows - offset))]
+        # Plain INSERTs (not COPY) so every row goes through the B-tree like the app's inserts
+        await conn.executemany(f"INSERT INTO {table} (uid, title, created_at) VALUES ($1, $2, $3)", records)
+    elapsed = time.perf_counter() - start_time
+
+    index_size = await conn.fetchval(f"SELECT pg_relation_size('{table}_pkey')")
+    blocks = await conn.fetchrow(
+        "SELECT idx_blks_read, idx_blks_hit FROM pg_statio_user_indexes WHERE indexrelname = $1",
+        f"{table}_pkey")
+
+    print(f"{name}: {rows / elapsed:,.0f} rows/s, pkey index {index_size / 1024 / 1024:,.1f} MiB, "
+          f"index blocks read {blocks['idx_blks_read']:,} / hit {blocks['idx_blks_hit']:,}")
+
+    await conn.execute(f"DROP TABLE {table}")
+
+
+async def main(args) -> None:
+    conn = await asyncpg.connect(config.DATABASE_URL.replace("+asyncpg", ""))
+    try:
+        for name in GENERATORS:
+            await run(conn, name, args.rows, args.batch_size)
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="uuid4 vs uuid7 insert benchmark")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,53 @@
+"""add book import tables
+
+Revision ID: 3f9c1e7a2b64
+Revises: ddfd2c42f1de
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1e7a2b64'
+down_revision: Union[str, Sequence[str], None] = 'ddfd2c42f1de'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('book_imports',
+    sa.Column('uid', postgresql.UUID(), nullable=False),
+    sa.Column('filename', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('file_format', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('rows_processed', sa.Integer(), nullable=False),
+    sa.Column('rows_imported', sa.Integer(), nullable=False),
+    sa.Column('rows_failed', sa.Integer(), nullable=False),
+    sa.Column('user_uid', sa.Uuid(), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(), nullable=True),
+    sa.Column('updated_at', postgresql.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['user_uid'], ['users.uid'], ),
+    sa.PrimaryKeyConstraint('uid')
+    )
+    op.create_table('book_import_errors',
+    sa.Column('uid', postgresql.UUID(), nullable=False),
+    sa.Column('import_uid', sa.Uuid(), nullable=False),
+    sa.Column('row_number', sa.Integer(), nullable=False),
+    sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.ForeignKeyConstraint(['import_uid'], ['book_imports.uid'], ),
+    sa.PrimaryKeyConstraint('uid')
+    )
+    op.create_index(op.f('ix_book_import_errors_import_uid'), 'book_import_errors', ['import_uid'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_book_import_errors_import_uid'), table_name='book_import_errors')
+    op.drop_table('book_import_errors')
+    op.drop_table('book_imports')
@@ -0,0 +1,53 @@
+"""uuid7 primary keys
+
+Revision ID: 7c2d4a9e5f10
+Revises: 3f9c1e7a2b64
+Create Date: 2026-10-19 11:05:17.642093
+
+New rows get time-ordered UUIDv7 keys — from src.db.ids.uuid7 in the app, and
+from uuid_generate_v7() as the column default for raw SQL / COPY inserts.
+Existing uuid4 keys are left as they are: both versions are valid uuids in the
+same column, rewriting them would break every stored book/user link, and only
+new inserts benefit from the ordering anyway.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2d4a9e5f10'
+down_revision: Union[str, Sequence[str], None] = '3f9c1e7a2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['users', 'books', 'reviews', 'book_imports', 'book_import_errors']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 48-bit unix ms timestamp + random bits of gen_random_uuid(), version nibble set to 7
+    op.execute("""
+        CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+        DECLARE
+            uuid_bytes bytea;
+        BEGIN
+            uuid_bytes := overlay(uuid_send(gen_random_uuid())
+                                  placing substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                                  FROM 1 FOR 6);
+            uuid_bytes := set_byte(uuid_bytes, 6, (get_byte(uuid_bytes, 6) & 15) | 112);
+            RETURN encode(uuid_bytes, 'hex')::uuid;
+        END
+        $$ LANGUAGE plpgsql VOLATILE;
+    """)
+    for table in TABLES:
+        op.alter_column(table, 'uid', server_default=sa.text('uuid_generate_v7()'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.alter_column(table, 'uid', server_default=None)
+    op.execute("DROP FUNCTION IF EXISTS uuid_generate_v7()")
@@ -0,0 +1,41 @@
+"""book trigram indexes
+
+Revision ID: a7d41e9c3f58
+Revises: f62b8d0e4c17
+Create Date: 2026-10-19 17:31:20.846127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d41e9c3f58'
+down_revision: Union[str, Sequence[str], None] = 'f62b8d0e4c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # GiST (not GIN): supports ORDER BY distance LIMIT n as an index scan
+    with op.get_context().autocommit_block():
+        op.create_index('ix_books_title_trgm', 'books', ['title'],
+                        postgresql_using='gist', postgresql_ops={'title': 'gist_trgm_ops'},
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_books_author_trgm', 'books', ['author'],
+                        postgresql_using='gist', postgresql_ops={'author': 'gist_trgm_ops'},
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_books_author_trgm', table_name='books',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_books_title_trgm', table_name='books',
+                      postgresql_concurrently=True, if_exists=True)
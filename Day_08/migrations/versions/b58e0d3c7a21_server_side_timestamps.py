@@ -0,0 +1,47 @@
+"""server side timestamps
+
+Revision ID: b58e0d3c7a21
+Revises: 7c2d4a9e5f10
+Create Date: 2026-10-19 11:48:02.917355
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b58e0d3c7a21'
+down_revision: Union[str, Sequence[str], None] = '7c2d4a9e5f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMP_COLUMNS = {
+    'books': ['created_at', 'updated_at'],
+    'reviews': ['created_at', 'updated_at'],
+    # users was created with `updated_at` but the model maps `update_at`
+    'users': ['created_at', 'updated_at', 'update_at'],
+}
+
+
+def _existing_columns():
+    inspector = sa.inspect(op.get_bind())
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        for column in columns:
+            if column in existing:
+                yield table, column
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in _existing_columns():
+        op.alter_column(table, column, server_default=sa.text('now()'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in _existing_columns():
+        op.alter_column(table, column, server_default=None)
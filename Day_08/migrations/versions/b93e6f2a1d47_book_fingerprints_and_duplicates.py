@@ -0,0 +1,97 @@
+"""book fingerprints and duplicates
+
+Revision ID: b93e6f2a1d47
+Revises: a7d41e9c3f58
+Create Date: 2026-10-19 18:52:07.413290
+
+"""
+import hashlib
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b93e6f2a1d47'
+down_revision: Union[str, Sequence[str], None] = 'a7d41e9c3f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_CHUNK_SIZE = 5000
+
+BACKFILL_UPDATE = sa.text("""
+    UPDATE books SET fingerprint = v.fingerprint
+    FROM unnest(CAST(:uids AS uuid[]), CAST(:fingerprints AS varchar[])) AS v(uid, fingerprint)
+    WHERE books.uid = v.uid
+""")
+
+
+# Frozen copy of src/books/fingerprint.py as of this revision: later changes to
+# the app's normalizer must not change what this migration writes
+_NON_ALNUM = re.compile(r"[\W_]+")
+
+
+def _normalize(value: str) -> str:
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return " ".join(_NON_ALNUM.sub(" ", value.casefold()).split())
+
+
+def _book_fingerprint(title: str, author: str, publisher: str) -> str:
+    normalized = "\x1f".join(_normalize(part) for part in (title, author, publisher))
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('fingerprint', postgresql.VARCHAR(length=40), nullable=True))
+    op.create_table('book_duplicates',
+    sa.Column('book_uid', postgresql.UUID(), nullable=False),
+    sa.Column('canonical_book_uid', postgresql.UUID(), nullable=False),
+    sa.Column('similarity', postgresql.REAL(), nullable=False),
+    sa.Column('computed_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.PrimaryKeyConstraint('book_uid')
+    )
+    op.create_index(op.f('ix_book_duplicates_canonical_book_uid'), 'book_duplicates',
+                    ['canonical_book_uid'], unique=False)
+
+    # Backfill in uid order, one chunk per statement. Autocommit: every chunk is
+    # committed on its own, so row locks are held for one chunk, not the whole table
+    books = sa.table('books', sa.column('uid', postgresql.UUID()), sa.column('title'),
+                     sa.column('author'), sa.column('publisher'))
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last_uid = None
+        while True:
+            statement = (sa.select(books.c.uid, books.c.title, books.c.author, books.c.publisher)
+                         .order_by(books.c.uid).limit(BACKFILL_CHUNK_SIZE))
+            if last_uid is not None:
+                statement = statement.where(books.c.uid > last_uid)
+            rows = bind.execute(statement).all()
+            if not rows:
+                break
+            bind.execute(BACKFILL_UPDATE, {
+                'uids': [uid for uid, _, _, _ in rows],
+                'fingerprints': [_book_fingerprint(title, author, publisher) for _, title, author, publisher in rows],
+            })
+            last_uid = rows[-1][0]
+
+    # Not unique: existing duplicates are reported by the dedupe job, not rejected
+    with op.get_context().autocommit_block():
+        op.create_index('ix_books_fingerprint', 'books', ['fingerprint'],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_books_fingerprint', table_name='books',
+                      postgresql_concurrently=True, if_exists=True)
+    op.drop_index(op.f('ix_book_duplicates_canonical_book_uid'), table_name='book_duplicates')
+    op.drop_table('book_duplicates')
+    op.drop_column('books', 'fingerprint')
@@ -0,0 +1,40 @@
+"""review pagination indexes
+
+Revision ID: c4e7a1d9b203
+Revises: b58e0d3c7a21
+Create Date: 2026-10-19 15:44:12.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e7a1d9b203'
+down_revision: Union[str, Sequence[str], None] = 'b58e0d3c7a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction, and doesn't block review writes
+    with op.get_context().autocommit_block():
+        op.create_index('ix_reviews_book_uid_created_at', 'reviews',
+                        ['book_uid', 'created_at', 'uid'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_reviews_book_uid_rating', 'reviews',
+                        ['book_uid', 'rating', 'created_at', 'uid'],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_reviews_book_uid_rating', table_name='reviews',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_reviews_book_uid_created_at', table_name='reviews',
+                      postgresql_concurrently=True, if_exists=True)
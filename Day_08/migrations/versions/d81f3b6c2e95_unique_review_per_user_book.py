@@ -0,0 +1,100 @@
+"""unique review per user and book
+
+Revision ID: d81f3b6c2e95
+Revises: c4e7a1d9b203
+Create Date: 2026-10-19 16:02:37.118452
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f3b6c2e95'
+down_revision: Union[str, Sequence[str], None] = 'c4e7a1d9b203'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEDUPE_CHUNK_SIZE = 5000
+# Passes over the table before giving up on duplicates that keep being written
+DEDUPE_MAX_PASSES = 5
+
+# Keep the most recently edited review of each (user, book) pair: collect the
+# uids of the others once (one scan), then delete them in uid chunks
+COLLECT_DUPLICATES = sa.text("""
+    CREATE TEMPORARY TABLE review_duplicates AS
+    SELECT uid FROM (
+        SELECT uid, row_number() OVER (
+            PARTITION BY user_uid, book_uid
+            ORDER BY updated_at DESC NULLS LAST, created_at DESC, uid DESC
+        ) AS position
+        FROM reviews
+        WHERE user_uid IS NOT NULL AND book_uid IS NOT NULL
+    ) ranked
+    WHERE position > 1
+""")
+
+NEXT_DUPLICATES = sa.text("""
+    SELECT uid FROM review_duplicates WHERE uid > :after ORDER BY uid LIMIT :chunk_size
+""")
+
+DELETE_DUPLICATES = sa.text("DELETE FROM reviews WHERE uid = ANY(CAST(:uids AS uuid[]))")
+
+INVALID_INDEX = sa.text("""
+    SELECT 1 FROM pg_index
+    WHERE indexrelid = to_regclass('uq_reviews_user_uid_book_uid') AND NOT indisvalid
+""")
+
+
+def _delete_duplicates(bind) -> int:
+    """One pass: returns the number of duplicate reviews found"""
+    bind.execute(sa.text("DROP TABLE IF EXISTS review_duplicates"))
+    bind.execute(COLLECT_DUPLICATES)
+    bind.execute(sa.text("ALTER TABLE review_duplicates ADD PRIMARY KEY (uid)"))
+    found = 0
+    after = uuid.UUID(int=0)
+    while uids := bind.execute(NEXT_DUPLICATES, {'after': after, 'chunk_size': DEDUPE_CHUNK_SIZE}).scalars().all():
+        bind.execute(DELETE_DUPLICATES, {'uids': uids})
+        found += len(uids)
+        after = uids[-1]
+    bind.execute(sa.text("DROP TABLE review_duplicates"))
+    return found
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Outside a transaction: every chunk commits on its own (short locks, no
+    # huge transaction) and the unique index is built CONCURRENTLY
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        # Until the constraint exists, reviews written meanwhile can add new
+        # duplicates: repeat until a pass finds none
+        for _ in range(DEDUPE_MAX_PASSES):
+            if not _delete_duplicates(bind):
+                break
+        else:
+            raise RuntimeError("Duplicate reviews are still being written after "
+                               f"{DEDUPE_MAX_PASSES} passes; pause review writes and rerun the migration")
+
+        # A failed earlier run leaves an INVALID index that IF NOT EXISTS would keep
+        if bind.execute(INVALID_INDEX).scalar():
+            op.drop_index('uq_reviews_user_uid_book_uid', table_name='reviews', postgresql_concurrently=True)
+        try:
+            op.create_index('uq_reviews_user_uid_book_uid', 'reviews', ['user_uid', 'book_uid'],
+                            unique=True, postgresql_concurrently=True, if_not_exists=True)
+        except sa.exc.IntegrityError as e:
+            op.drop_index('uq_reviews_user_uid_book_uid', table_name='reviews',
+                          postgresql_concurrently=True, if_exists=True)
+            raise RuntimeError("A duplicate review was written while the unique index was built; "
+                               "rerun the migration") from e
+        op.execute('ALTER TABLE reviews ADD CONSTRAINT uq_reviews_user_uid_book_uid '
+                   'UNIQUE USING INDEX uq_reviews_user_uid_book_uid')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_reviews_user_uid_book_uid', 'reviews', type_='unique')
@@ -0,0 +1,35 @@
+"""add book related table
+
+Revision ID: e3a9c5f71b42
+Revises: d81f3b6c2e95
+Create Date: 2026-10-19 16:41:55.273019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c5f71b42'
+down_revision: Union[str, Sequence[str], None] = 'd81f3b6c2e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('book_related',
+    sa.Column('book_uid', postgresql.UUID(), nullable=False),
+    sa.Column('related_book_uids', postgresql.ARRAY(postgresql.UUID()), nullable=False),
+    sa.Column('scores', postgresql.ARRAY(postgresql.REAL()), nullable=False),
+    sa.Column('computed_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.PrimaryKeyConstraint('book_uid')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('book_related')
@@ -0,0 +1,34 @@
+"""review created_at index
+
+Revision ID: f62b8d0e4c17
+Revises: e3a9c5f71b42
+Create Date: 2026-10-19 17:05:48.390716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f62b8d0e4c17'
+down_revision: Union[str, Sequence[str], None] = 'e3a9c5f71b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Watermark scans of the trending job: WHERE (created_at, uid) > (...)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_reviews_created_at_uid', 'reviews', ['created_at', 'uid'],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_reviews_created_at_uid', table_name='reviews',
+                      postgresql_concurrently=True, if_exists=True)
@@ -7,8 +7,12 @@ from fastapi import FastAPI
 from src.auth.routes import auth_router
 from src.books.routes import router
 from src.reviews.routes import review_router
+import asyncio
 from contextlib import asynccontextmanager
 from src.db.main import init_db
+from src.db.redis import redis_manager, local_blocklist
+from src.metrics import metrics_router
+from src.responses import BooklyJSONResponse, serializers
 # from .exception import 
 from .middleware import register_middleware
 
@@ -18,12 +22,19 @@ async def life_span(app: FastAPI):
     print("🚀 The server is starting ...")
     # Initialize database tables (create_all)
     await init_db()
+    # Compile the response serializers once, before the first request
+    serializers.build()
+    # Keep this worker's copy of revoked JTIs in sync (used while Redis is unavailable)
+    blocklist_sync = asyncio.create_task(local_blocklist.run_sync_loop())
 
     # (Optional) you could run seed/test data here if you want — commented out:
     # from src.db.seed import seed_data
     # await seed_data()
 
     yield
+    blocklist_sync.cancel()
+    # Release the shared Redis pool
+    await redis_manager.close()
     print("🛑 The server has stopped ...")
 
 
@@ -33,7 +44,8 @@ app = FastAPI(
     title="📚 Bookly API",
     description="A REST API for managing book reviews using FastAPI + SQLModel",
     version=version,
-    lifespan=life_span
+    lifespan=life_span,
+    default_response_class=BooklyJSONResponse
 )
 
 register_middleware(app)
@@ -41,4 +53,15 @@ register_middleware(app)
 # Attach books router under /api/v1/book
 app.include_router(router, prefix=f"/api/{version}/book", tags=["book"])
 app.include_router(auth_router, prefix=f"/api/{version}/auth", tags=["auth"])
-app.include_router(review_router, prefix=f"/api/{version}/reviews", tags=[['reviews']])
\ No newline at end of file
+app.include_router(review_router, prefix=f"/api/{version}/reviews", tags=[['reviews']])
+app.include_router(metrics_router, tags=["metrics"])
+
+
+@app.get("/health", tags=["metrics"])
+async def health():
+    """
+    GET /health
+    Redis connectivity and shared pool usage of this worker
+    """
+    return {"redis": await redis_manager.health_check(),
+            "redis_pool": redis_manager.pool_stats()}
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Adaptive admission control / load shedding.
+
+Each route class (read, write, bulk) gets a concurrency limit that adapts to
+observed latency with AIMD: every request that finishes under the target
+latency grows the limit by 1/limit (about +1 per "round"), a slow or failed
+request shrinks it by ADMISSION_BACKOFF. Requests over the limit wait in a
+bounded FIFO queue; if the queue is full, or the expected wait already exceeds
+the queue deadline, the request is rejected at once with 503 + Retry-After
+instead of piling up until the DB pool times out.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque, Optional
+from src.config import config
+from src.metrics import registry
+
+admission_decisions = registry.counter("admission_decisions")
+admission_limit = registry.gauge("admission_limit")
+admission_in_flight = registry.gauge("admission_in_flight")
+
+
+class Rejected(Exception):
+    def __init__(self, retry_after: int) -> None:
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    def __init__(self, name: str, initial_limit: int, min_limit: int, max_limit: int,
+                 target_latency: float, queue_size: int, queue_timeout: float) -> None:
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        # Smoothed latency, used to estimate how long a queued request would wait
+        self.avg_latency = target_latency
+
+    def _publish(self) -> None:
+        admission_limit.set(round(self.limit, 2), self.name)
+        admission_in_flight.set(self.in_flight, self.name)
+
+    def expected_wait(self) -> float:
+        return (len(self.waiters) + 1) * self.avg_latency / max(self.limit, 1)
+
+    async def acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self.waiters:
+            self.in_flight += 1
+            admission_decisions.inc(self.name, "admitted")
+            self._publish()
+            return
+
+        expected_wait = self.expected_wait()
+        if len(self.waiters) >= self.queue_size or expected_wait > self.queue_timeout:
+            admission_decisions.inc(self.name, "rejected")
+            raise Rejected(retry_after=max(1, math.ceil(expected_wait)))
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            # release() hands the slot over by resolving the future (in_flight already counted)
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not self._granted(waiter):
+                admission_decisions.inc(self.name, "timed_out")
+                raise Rejected(retry_after=max(1, math.ceil(self.expected_wait())))
+        except asyncio.CancelledError:
+            # Client went away while queued — pass the slot on if we already got it
+            if self._granted(waiter):
+                self.release(latency=None)
+            raise
+
+        admission_decisions.inc(self.name, "queued")
+
+    def _granted(self, waiter: asyncio.Future) -> bool:
+        """True if the slot was handed to this waiter; otherwise drop it from the queue"""
+        if waiter.done() and not waiter.cancelled():
+            return True
+        waiter.cancel()
+        if waiter in self.waiters:
+            self.waiters.remove(waiter)
+        return False
+
+    def release(self, latency: Optional[float], failed: bool = False) -> None:
+        if latency is not None:
+            self.avg_latency = 0.9 * self.avg_latency + 0.1 * latency
+            if failed or latency > self.target_latency:
+                self.limit = max(self.min_limit, self.limit * config.ADMISSION_BACKOFF)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        # Hand the slot to the oldest waiter still waiting, otherwise free it
+        while self.waiters and self.in_flight <= int(self.limit):
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._publish()
+                return
+        self.in_flight -= 1
+        self._publish()
+
+
+def _limiter(name: str, initial_limit: int) -> AdaptiveLimiter:
+    return AdaptiveLimiter(name,
+                           initial_limit=initial_limit,
+                           min_limit=config.ADMISSION_MIN_LIMIT,
+                           max_limit=config.ADMISSION_MAX_LIMIT,
+                           target_latency=config.ADMISSION_TARGET_LATENCY_MS / 1000,
+                           queue_size=config.ADMISSION_QUEUE_SIZE,
+                           queue_timeout=config.ADMISSION_QUEUE_TIMEOUT)
+
+
+# One limiter per route class
+limiters = {
+    "read": _limiter("read", config.ADMISSION_READ_LIMIT),
+    "write": _limiter("write", config.ADMISSION_WRITE_LIMIT),
+    # Bulk imports are long by nature — one at a time, no adapting
+    "bulk": AdaptiveLimiter("bulk", initial_limit=1, min_limit=1, max_limit=1,
+                            target_latency=float("inf"), queue_size=0, queue_timeout=0),
+}
+
+# Never shed these — they are how we see what is going on
+EXEMPT_PATHS = ("/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    if path.startswith(EXEMPT_PATHS):
+        return None
+    if path.endswith("/book/import"):
+        return "bulk"
+    if method in ("GET", "HEAD") or path.endswith("/book/batch"):
+        return "read"
+    return "write"
+
+
+class Admission:
+    """async context manager: `async with Admission(limiter): ...`"""
+
+    def __init__(self, limiter: AdaptiveLimiter) -> None:
+        self.limiter = limiter
+        self.start_time = 0.0
+        self.failed = False
+
+    async def __aenter__(self):
+        await self.limiter.acquire()
+        self.start_time = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.limiter.release(latency=time.perf_counter() - self.start_time,
+                             failed=self.failed or exc_type is not None)
+        return False
@@ -5,7 +5,7 @@ from fastapi.exceptions import HTTPException
 from fastapi.security.http import HTTPAuthorizationCredentials
 from .utils import decode_token
 from src.db.redis import token_in_blocklist
-from src.db.main import get_session
+from src.db.main import get_read_session
 from src.db.model import User
 from src.exception import InvalidToken
 from src.exception import InvalidToken, RefreshTokenRequired, AccessTokenRequired, InsufficientPermission, AccountNotVerified
@@ -76,7 +76,7 @@ class RefreshTokenBearer(TokenBearer):
             
             
 async def get_current_user(token_details: dict=Depends(AccessTokenBearer()),
-                            session : AsyncSession = Depends(get_session)):
+                            session : AsyncSession = Depends(get_read_session)):
     user_email = token_details['user']['email']
     
     user = await user_service.get_user_by_email(user_email, session)
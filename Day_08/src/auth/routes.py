@@ -23,6 +23,7 @@ from .schemas import UserCreation, UserModel, UserLoginModel, UserBooksModel, Em
 # Core Logic
 from .service import UserService
 from .utils import create_access_token, decode_token, verify_passwd, create_url_safe_token, decode_url_safe_token, generate_passwd_hash
+from src.responses import serialize_response
 from .dependencies import RefreshTokenBearer, AccessTokenBearer, get_current_user, RoleChecker
 
 
@@ -163,7 +164,7 @@ async def get_new_access_token(token_details : dict = Depends(RefreshTokenBearer
 
 @auth_router.get('/me', response_model=UserBooksModel)
 async def get_current_user(user = Depends(get_current_user), _: bool = Depends(role_checker)):
-    return user
+    return serialize_response(UserBooksModel, user)
 
     
 @auth_router.get("/logout")
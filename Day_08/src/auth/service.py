@@ -26,8 +26,8 @@ class UserService:
         new_user.role = "user"
 
         session.add(new_user)
+        # Server defaults come back from INSERT ... RETURNING, no refresh needed
         await session.commit()
-        await session.refresh(new_user)
 
         return new_user
 
@@ -0,0 +1,141 @@
+"""
+Batch near-duplicate detection over the whole catalog with MinHash + LSH.
+
+Offline job (Celery beat, src/celery_task.py):
+
+  1. stream (uid, title, author) in uid order (oldest first, uids are uuid7)
+     and compute a DEDUPE_NUM_PERM-value MinHash signature of each book's
+     "title author" character 3-gram shingles,
+  2. LSH: split signatures into DEDUPE_BANDS bands; books whose band values
+     are identical in any band are candidates. Each band is grouped with one
+     sort of a uint64 key array — no pairwise comparisons,
+  3. a candidate is merged into its group's first book if their signatures
+     agree on at least DEDUPE_THRESHOLD of the values (estimated Jaccard),
+  4. the clusters (union-find, the oldest book is the canonical one) replace
+     `book_duplicates` in one transaction with COPY.
+
+Work and memory are linear in the catalog size: n x DEDUPE_NUM_PERM uint32
+signatures plus one band key array at a time.
+"""
+
+import logging
+import time
+import uuid
+import zlib
+from datetime import datetime
+from typing import List
+import numpy as np
+from sqlalchemy import select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import config
+from src.db.model import Book, BookDuplicate
+from .fingerprint import shingles
+
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+BAND_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+DUPLICATE_COPY_COLUMNS = ["book_uid", "canonical_book_uid", "similarity", "computed_at"]
+
+
+class MinHasher:
+    def __init__(self, num_perm: int, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        # Universal hashing h(x) = (a * x + b) mod p with x, a, b < p = 2^31 - 1,
+        # so a * x + b fits in uint64
+        self.a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, text: str) -> np.ndarray:
+        values = np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles(text)), dtype=np.uint64)
+        values %= MERSENNE_PRIME
+        if not len(values):
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        hashed = (np.outer(self.a, values) + self.b[:, None]) % MERSENNE_PRIME
+        return hashed.min(axis=1).astype(np.uint32)
+
+
+class UnionFind:
+    def __init__(self, size: int) -> None:
+        self.parent = np.arange(size, dtype=np.int64)
+
+    def find(self, item: int) -> int:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return int(root)
+
+    def union(self, first: int, second: int) -> None:
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            # The smaller index (older book) stays the root
+            self.parent[max(first, second)] = min(first, second)
+
+
+def cluster(signatures: np.ndarray, bands: int, threshold: float) -> UnionFind:
+    n_books, num_perm = signatures.shape
+    rows = num_perm // bands
+    clusters = UnionFind(n_books)
+    for band in range(bands):
+        # One 64 bit key per book for this band (polynomial hash, wraps around)
+        keys = np.zeros(n_books, dtype=np.uint64)
+        for column in signatures[:, band * rows:(band + 1) * rows].T:
+            keys = keys * BAND_HASH_MULTIPLIER + column.astype(np.uint64)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+        for start, end in zip(starts, ends):
+            if end - start < 2:
+                continue
+            members = order[start:end]
+            first = members[0]
+            similarity = (signatures[members[1:]] == signatures[first]).mean(axis=1)
+            for member in members[1:][similarity >= threshold]:
+                clusters.union(int(first), int(member))
+    return clusters
+
+
+class DuplicateBooksJob:
+    async def load_signatures(self, session: AsyncSession, hasher: MinHasher):
+        uids: List[uuid.UUID] = []
+        signatures = []
+        statement = (select(Book.uid, Book.title, Book.author)
+                     .order_by(Book.uid)
+                     .execution_options(yield_per=config.DEDUPE_FETCH_SIZE))
+        result = await session.stream(statement)
+        async for partition in result.partitions():
+            for uid, title, author in partition:
+                uids.append(uid)
+                signatures.append(hasher.signature(f"{title} {author}"))
+        matrix = np.vstack(signatures) if signatures else np.empty((0, hasher.num_perm), dtype=np.uint32)
+        return uids, matrix
+
+    async def run(self, session: AsyncSession) -> int:
+        """Recompute book_duplicates; returns the number of books found to be duplicates"""
+        start_time = time.perf_counter()
+        hasher = MinHasher(config.DEDUPE_NUM_PERM)
+        uids, signatures = await self.load_signatures(session, hasher)
+        await session.commit()
+
+        clusters = cluster(signatures, config.DEDUPE_BANDS, config.DEDUPE_THRESHOLD)
+        computed_at = datetime.now()
+        records = []
+        for index in range(len(uids)):
+            root = clusters.find(index)
+            if root != index:
+                similarity = float((signatures[index] == signatures[root]).mean())
+                records.append((uids[index], uids[root], similarity, computed_at))
+        logging.info("Duplicate books: %s books, %s duplicates found in %.1fs",
+                     len(uids), len(records), time.perf_counter() - start_time)
+
+        # Readers keep seeing the previous results until this commits
+        connection = await session.connection()
+        await session.execute(delete(BookDuplicate))
+        raw_connection = await connection.get_raw_connection()
+        if records:
+            await raw_connection.driver_connection.copy_records_to_table(
+                "book_duplicates", records=records, columns=DUPLICATE_COPY_COLUMNS)
+        await session.commit()
+        return len(records)
@@ -0,0 +1,59 @@
+"""
+Sparse fieldsets: `?fields=uid,title,author` on the book read endpoints.
+
+The requested names are turned into a column projection (`load_only` for the
+ORM paths, a narrower select list for the core fast path) and relationships
+that were not asked for are not loaded at all. The result is encoded straight
+to JSON with orjson (dumps_json), so nothing unrequested is read, serialized or sent.
+"""
+
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy.orm import load_only, noload, selectinload
+from src.db.model import Book
+from src.responses import dumps_json
+from src.reviews.schema import ReviweModel
+from .schema import Book as BookSchema
+
+BOOK_FIELDS = tuple(BookSchema.model_fields)
+REVIEW_FIELDS = tuple(ReviweModel.model_fields)
+RELATIONSHIPS = ("reviews",)
+
+
+def parse_fields(fields: Optional[str], allow_reviews: bool = False) -> Optional[Tuple[str, ...]]:
+    """
+    "title,author" -> ("uid", "title", "author"); None when no fields= was given.
+    uid is always returned so clients can tell the items apart.
+    """
+    if fields is None:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    allowed = BOOK_FIELDS + (RELATIONSHIPS if allow_reviews else ())
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Unknown fields {unknown}, choose from {list(allowed)}")
+    return tuple(dict.fromkeys(["uid", *requested]))
+
+
+def column_fields(fields: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(name for name in fields if name in BOOK_FIELDS)
+
+
+def load_options(fields: Tuple[str, ...]) -> list:
+    """ORM loader options: only the requested columns, reviews only if requested"""
+    options = [load_only(*(getattr(Book, name) for name in column_fields(fields)))]
+    options.append(selectinload(Book.reviews) if "reviews" in fields else noload(Book.reviews))
+    return options
+
+
+def book_to_dict(book: Book, fields: Tuple[str, ...]) -> dict:
+    data = {name: getattr(book, name) for name in column_fields(fields)}
+    if "reviews" in fields:
+        data["reviews"] = [{name: getattr(review, name) for name in REVIEW_FIELDS}
+                           for review in book.reviews]
+    return data
+
+
+def encode_book(book: Book, fields: Tuple[str, ...]) -> bytes:
+    return dumps_json(book_to_dict(book, fields))
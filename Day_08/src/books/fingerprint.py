@@ -0,0 +1,36 @@
+"""
+Normalized book fingerprints for duplicate detection.
+
+"The Hobbit!", "the  hobbit" and "Thé Hobbit" all normalize to "the hobbit"
+(Unicode compatibility form, accents and punctuation stripped, case folded,
+whitespace collapsed). The fingerprint is a hash of normalized title, author
+and publisher, stored in the indexed `books.fingerprint` column so an exact
+(normalized) duplicate is found with one index lookup on insert.
+Near-duplicates ("The Hobit") are left to the MinHash job in dedupe.py.
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Set
+
+_NON_ALNUM = re.compile(r"[\W_]+")
+
+
+def normalize(value: str) -> str:
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return " ".join(_NON_ALNUM.sub(" ", value.casefold()).split())
+
+
+def book_fingerprint(title: str, author: str, publisher: str) -> str:
+    normalized = "\x1f".join(normalize(part) for part in (title, author, publisher))
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def shingles(value: str, size: int = 3) -> Set[str]:
+    """Character n-grams of the normalized text (the text itself if shorter)"""
+    value = normalize(value)
+    if len(value) <= size:
+        return {value} if value else set()
+    return {value[i:i + size] for i in range(len(value) - size + 1)}
@@ -0,0 +1,52 @@
+"""
+Command line bulk import for big publisher catalogs.
+
+    python -m src.books.import_cli catalog.csv --user-uid <uid>
+    python -m src.books.import_cli catalog.ndjson --user-uid <uid> --resume <import_uid>
+"""
+
+import argparse
+import asyncio
+import uuid
+from src.config import config
+from src.db.main import SessionLocal
+from src.books.importer import BookImportService, ImportInProgress, SUPPORTED_FORMATS, detect_format
+
+book_import_service = BookImportService()
+
+
+async def main(args) -> None:
+    async with SessionLocal() as session:
+        if args.resume:
+            job, _ = await book_import_service.get_import(uuid.UUID(args.resume), session)
+            if job is None:
+                raise SystemExit(f"Import {args.resume} not found")
+        else:
+            file_format = args.format or detect_format(args.path)
+            if file_format not in SUPPORTED_FORMATS:
+                raise SystemExit(f"Unsupported format, use --format with one of {SUPPORTED_FORMATS}")
+            job = await book_import_service.create_import(args.path, file_format, args.user_uid, session)
+
+        print(f"Importing {args.path} as {job.uid} (resuming after row {job.rows_processed})")
+
+        with open(args.path, "rb") as file:
+            try:
+                job = await book_import_service.run_import(job, file, session, chunk_size=args.chunk_size)
+            except ImportInProgress:
+                raise SystemExit(f"Import {job.uid} is already running in another worker")
+
+        job, errors = await book_import_service.get_import(job.uid, session)
+        print(f"{job.status}: {job.rows_imported} imported, {job.rows_failed} rejected")
+        for error in errors:
+            print(f"  row {error.row_number}: {error.error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import books with PostgreSQL COPY")
+    parser.add_argument("path")
+    parser.add_argument("--user-uid", required=True, help="uid of the user the books belong to")
+    parser.add_argument("--format", choices=SUPPORTED_FORMATS)
+    parser.add_argument("--resume", help="import uid of an interrupted import")
+    parser.add_argument("--chunk-size", type=int, default=config.IMPORT_CHUNK_SIZE)
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,233 @@
+"""
+Bulk book import (CSV or NDJSON) through PostgreSQL COPY.
+
+The file is read row by row from disk (an UploadFile is already spooled to a
+temp file), validated, and loaded in chunks with asyncpg's
+copy_records_to_table. Every chunk is committed together with the job's
+progress row and its rejected rows, so an interrupted import can be resumed
+from `rows_processed` without loading anything twice. A cancelled import (request
+deadline, client disconnect) is marked "interrupted", a failed one "failed" —
+never left "running".
+
+A job is run by one worker at a time: the import holds a session-level
+advisory lock on the job uid, on a connection of its own, until it stops.
+Resuming a job that is being imported fails with ImportInProgress; a job
+left "running" by a killed worker can be resumed, since its lock went away
+with the connection.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import uuid
+import itertools
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy import func, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from src.config import config
+from src.db.main import SessionLocal, async_engine
+from src.db.model import BookImport, BookImportError
+from src.db.ids import uuid7
+from .fingerprint import book_fingerprint
+from .schema import BookImportRow
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+BOOK_COPY_COLUMNS = ["uid", "title", "author", "publisher", "published_date",
+                     "page_count", "language", "user_uid", "created_at", "updated_at", "fingerprint"]
+ERROR_COPY_COLUMNS = ["uid", "import_uid", "row_number", "error"]
+
+
+class ImportInProgress(Exception):
+    """Another worker is running this import"""
+
+
+def detect_format(filename: str) -> Optional[str]:
+    extension = filename.rsplit(".", 1)[-1].lower()
+    if extension == "csv":
+        return "csv"
+    if extension in ("ndjson", "jsonl"):
+        return "ndjson"
+    return None
+
+
+def iter_rows(file: BinaryIO, file_format: str, start_after: int = 0) -> Iterator[Tuple[int, Union[dict, str]]]:
+    """
+    Yield (row_number, row dict) — or (row_number, error message) for rows that
+    can't even be parsed. Rows up to `start_after` are skipped.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+
+    if file_format == "csv":
+        # CSV must be parsed to skip rows (quoted fields may contain newlines)
+        rows = enumerate(csv.DictReader(text), start=1)
+        yield from itertools.islice(rows, start_after, None)
+        return
+
+    for row_number, line in enumerate(text, start=1):
+        if row_number <= start_after or not line.strip():
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except ValueError as e:
+            yield row_number, f"invalid JSON: {e}"
+
+
+def _format_validation_error(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+
+def read_chunk(rows: Iterator, chunk_size: int, import_uid: uuid.UUID, user_uid: Optional[uuid.UUID]):
+    """
+    Validate the next `chunk_size` rows (runs in a worker thread).
+    Returns (book records, error records, last row number).
+    """
+    now = datetime.now()
+    books, errors, last_row = [], [], None
+
+    for row_number, row in itertools.islice(rows, chunk_size):
+        last_row = row_number
+        if isinstance(row, str):
+            errors.append((uuid7(), import_uid, row_number, row))
+            continue
+        if not isinstance(row, dict):
+            errors.append((uuid7(), import_uid, row_number, "row must be an object"))
+            continue
+        try:
+            book = BookImportRow.model_validate(row)
+        except ValidationError as e:
+            errors.append((uuid7(), import_uid, row_number, _format_validation_error(e)))
+            continue
+
+        # Fingerprints are stored but not checked here: duplicates in bulk loads
+        # are reported by the dedupe job (src/books/dedupe.py)
+        books.append((uuid7(), book.title, book.author, book.publisher, book.published_date,
+                      book.page_count, book.language, user_uid, now, now,
+                      book_fingerprint(book.title, book.author, book.publisher)))
+
+    return books, errors, last_row
+
+
+class BookImportService:
+    async def create_import(self, filename: str, file_format: str, user_uid: str, session: AsyncSession):
+        job = BookImport(filename=filename, file_format=file_format, user_uid=uuid.UUID(user_uid))
+        session.add(job)
+        await session.commit()
+        return job
+
+    async def get_import(self, import_uid: uuid.UUID, session: AsyncSession, error_limit: int = 100):
+        """
+        Return (job, first `error_limit` rejected rows) or (None, []) if not found.
+        """
+        job = await session.get(BookImport, import_uid)
+        if job is None:
+            return None, []
+
+        statement = (select(BookImportError)
+                     .where(BookImportError.import_uid == job.uid)
+                     .order_by(BookImportError.row_number)
+                     .limit(error_limit))
+        result = await session.exec(statement)
+        return job, result.all()
+
+    @asynccontextmanager
+    async def claim(self, import_uid: uuid.UUID):
+        """
+        Hold the job's advisory lock for the block, or raise ImportInProgress.
+        Session level, on its own connection: the session's connection goes back
+        to the pool at every chunk commit.
+        """
+        key = func.hashtextextended(str(import_uid), 0)
+        async with async_engine.connect() as connection:
+            claimed = (await connection.execute(select(func.pg_try_advisory_lock(key)))).scalar_one()
+            # Don't sit idle in a transaction for the whole import
+            await connection.commit()
+            if not claimed:
+                raise ImportInProgress(import_uid)
+            try:
+                yield
+            finally:
+                try:
+                    await connection.execute(select(func.pg_advisory_unlock(key)))
+                    await connection.commit()
+                except BaseException:
+                    # Closing the connection releases the lock as well
+                    await connection.invalidate()
+                    raise
+
+    async def run_import(self, job: BookImport, file: BinaryIO, session: AsyncSession,
+                         chunk_size: int = config.IMPORT_CHUNK_SIZE):
+        """
+        Load the file into `books`, resuming after job.rows_processed.
+        Raises ImportInProgress if another worker is running the job.
+        """
+        async with self.claim(job.uid):
+            # Progress may have moved on while another worker held the job
+            job = await session.get(BookImport, job.uid, populate_existing=True)
+            if job.status == "completed":
+                return job
+            return await self._load(job, file, session, chunk_size)
+
+    async def _load(self, job: BookImport, file: BinaryIO, session: AsyncSession, chunk_size: int):
+        rows = iter_rows(file, job.file_format, start_after=job.rows_processed)
+        import_uid, user_uid = job.uid, job.user_uid
+        job.status = "running"
+
+        try:
+            while True:
+                books, errors, last_row = await run_in_threadpool(read_chunk, rows, chunk_size,
+                                                                   import_uid, user_uid)
+                if last_row is None:
+                    break
+
+                job.rows_processed = last_row
+                job.rows_imported += len(books)
+                job.rows_failed += len(errors)
+                session.add(job)
+                # Flushing the progress UPDATE opens the transaction the COPYs run in
+                await session.flush()
+
+                connection = await session.connection()
+                raw_connection = await connection.get_raw_connection()
+                driver_connection = raw_connection.driver_connection
+                if books:
+                    await driver_connection.copy_records_to_table(
+                        "books", records=books, columns=BOOK_COPY_COLUMNS)
+                if errors:
+                    await driver_connection.copy_records_to_table(
+                        "book_import_errors", records=errors, columns=ERROR_COPY_COLUMNS)
+
+                await session.commit()
+
+            job.status = "completed"
+            session.add(job)
+            await session.commit()
+
+        except BaseException as e:
+            # Cancelled (request deadline, client gone, Ctrl-C in the CLI): resumable
+            status = "interrupted" if isinstance(e, asyncio.CancelledError) else "failed"
+            # Shielded: a second cancellation must not leave the job "running"
+            await asyncio.shield(self._mark_stopped(session, import_uid, status))
+            job.status = status
+            raise
+
+        return job
+
+    async def _mark_stopped(self, session: AsyncSession, import_uid: uuid.UUID, status: str) -> None:
+        try:
+            await session.rollback()
+        except Exception:
+            # The connection was interrupted mid-COPY: drop it, which also releases its locks
+            await session.invalidate()
+        # Fresh session: the request's one may be unusable after a cancellation
+        async with SessionLocal() as status_session:
+            await status_session.execute(update(BookImport)
+                                         .where(BookImport.uid == import_uid)
+                                         .values(status=status, updated_at=datetime.now()))
+            await status_session.commit()
@@ -0,0 +1,150 @@
+"""
+Top-rated / most-reviewed book leaderboards kept in Redis.
+
+Per book we keep the review count and rating sum (two hashes) and two sorted
+sets, updated atomically by a Lua script every time a review is written:
+
+  leaderboard:top:reviews -> score = review count
+  leaderboard:top:rating  -> score = Bayesian average
+                             (C * m + rating_sum) / (C + review_count)
+
+m is the mean rating of all reviews (refreshed by reconciliation) and C is
+LEADERBOARD_PRIOR_WEIGHT: a book with 2 perfect reviews stays close to the
+global mean until enough reviews back it up.
+
+Reads are ZREVRANGE + HMGET (O(log n + N)) and never touch PostgreSQL.
+`rebuild` recomputes everything from the reviews table (Celery beat, see
+src/celery_task.py) to repair drift, e.g. from writes made while Redis was down.
+"""
+
+import logging
+from typing import Iterable, List, Optional, Tuple
+import uuid
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import config
+from src.db.model import Review
+from src.db.redis import redis_manager, redis_timeout
+
+COUNT_KEY = "leaderboard:review_count"
+SUM_KEY = "leaderboard:rating_sum"
+MEAN_KEY = "leaderboard:prior_mean"
+BOARD_KEYS = {"rating": "leaderboard:top:rating", "reviews": "leaderboard:top:reviews"}
+ALL_KEYS = (COUNT_KEY, SUM_KEY, BOARD_KEYS["rating"], BOARD_KEYS["reviews"], MEAN_KEY)
+
+# KEYS: count hash, sum hash, rating board, reviews board, prior mean
+# ARGV: book_uid, count delta, rating sum delta, prior weight, default prior mean
+RECORD_REVIEW = """
+local count = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+local total = redis.call('HINCRBY', KEYS[2], ARGV[1], ARGV[3])
+local mean = tonumber(redis.call('GET', KEYS[5]) or ARGV[5])
+local weight = tonumber(ARGV[4])
+redis.call('ZADD', KEYS[3], (weight * mean + total) / (weight + count), ARGV[1])
+redis.call('ZADD', KEYS[4], count, ARGV[1])
+return count
+"""
+
+
+def bayesian_score(review_count: int, rating_sum: int, mean: float) -> float:
+    weight = config.LEADERBOARD_PRIOR_WEIGHT
+    return (weight * mean + rating_sum) / (weight + review_count)
+
+
+class Leaderboard:
+    def __init__(self, redis: Optional[Redis] = None) -> None:
+        self._redis = redis
+
+    @property
+    def redis(self) -> Redis:
+        return self._redis or redis_manager.client
+
+    async def record_reviews(self, reviews: Iterable[Tuple[uuid.UUID, int, Optional[int]]]) -> None:
+        """
+        (book_uid, rating, previous rating or None if the review is new) per written review.
+        Failures are only logged — the periodic rebuild repairs the boards.
+        """
+        try:
+            script = self.redis.register_script(RECORD_REVIEW)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for book_uid, rating, old_rating in reviews:
+                    count_delta = 1 if old_rating is None else 0
+                    await script(keys=ALL_KEYS,
+                                 args=[str(book_uid), count_delta, rating - (old_rating or 0),
+                                       config.LEADERBOARD_PRIOR_WEIGHT, config.LEADERBOARD_PRIOR_MEAN],
+                                 client=pipe)
+                await pipe.execute()
+        except RedisError as e:
+            logging.warning("Leaderboard update failed, left to reconciliation: %s", e)
+
+    async def remove_book(self, book_uid: uuid.UUID) -> None:
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for board in BOARD_KEYS.values():
+                    pipe.zrem(board, str(book_uid))
+                pipe.hdel(COUNT_KEY, str(book_uid))
+                pipe.hdel(SUM_KEY, str(book_uid))
+                await pipe.execute()
+        except RedisError as e:
+            logging.warning("Leaderboard cleanup failed, left to reconciliation: %s", e)
+
+    async def top(self, by: str, limit: int) -> List[dict]:
+        board = await self.redis.zrevrange(BOARD_KEYS[by], 0, limit - 1, withscores=True)
+        if not board:
+            return []
+        uids = [uid for uid, _ in board]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hmget(COUNT_KEY, uids)
+            pipe.hmget(SUM_KEY, uids)
+            counts, sums = await pipe.execute()
+
+        books = []
+        for (uid, score), count, total in zip(board, counts, sums):
+            count, total = int(count or 0), int(total or 0)
+            books.append({"uid": uid.decode(),
+                          "score": score,
+                          "review_count": count,
+                          "average_rating": total / count if count else None})
+        return books
+
+    async def rebuild(self, session: AsyncSession) -> int:
+        """Recompute every board from PostgreSQL, swap them in with RENAME; returns the number of books"""
+        statement = (select(Review.book_uid, func.count(), func.sum(Review.rating))
+                     .where(Review.book_uid.is_not(None))
+                     .group_by(Review.book_uid))
+        rows = (await session.execute(statement)).all()
+
+        review_count = sum(count for _, count, _ in rows)
+        mean = sum(total for _, _, total in rows) / review_count if review_count else config.LEADERBOARD_PRIOR_MEAN
+
+        tmp_keys = {key: f"{key}:rebuild" for key in ALL_KEYS}
+        # Big pipelines: don't hold them to the per-command deadline
+        with redis_timeout(config.LEADERBOARD_REBUILD_TIMEOUT):
+            await self._write_boards(rows, mean, tmp_keys)
+        return len(rows)
+
+    async def _write_boards(self, rows, mean: float, tmp_keys: dict) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(*tmp_keys.values())
+            for start in range(0, len(rows), config.LEADERBOARD_REBUILD_CHUNK):
+                chunk = rows[start:start + config.LEADERBOARD_REBUILD_CHUNK]
+                pipe.hset(tmp_keys[COUNT_KEY], mapping={str(uid): count for uid, count, _ in chunk})
+                pipe.hset(tmp_keys[SUM_KEY], mapping={str(uid): total for uid, _, total in chunk})
+                pipe.zadd(tmp_keys[BOARD_KEYS["reviews"]], {str(uid): count for uid, count, _ in chunk})
+                pipe.zadd(tmp_keys[BOARD_KEYS["rating"]],
+                          {str(uid): bayesian_score(count, total, mean) for uid, count, total in chunk})
+            pipe.set(tmp_keys[MEAN_KEY], mean)
+            await pipe.execute()
+
+        # Swap all boards in at once
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for key, tmp_key in tmp_keys.items():
+                if rows or key == MEAN_KEY:
+                    pipe.rename(tmp_key, key)
+                else:
+                    pipe.delete(key)
+            await pipe.execute()
+
+
+leaderboard = Leaderboard()
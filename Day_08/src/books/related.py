@@ -0,0 +1,166 @@
+"""
+"Readers also reviewed": related books from review co-occurrence.
+
+Offline job (Celery beat, src/celery_task.py) that
+
+  1. streams the (user_uid, book_uid) pairs of `reviews` ordered by user (an
+     index scan of uq_reviews_user_uid_book_uid) into two int32 arrays — users
+     only need a row number, books get a column index,
+  2. builds the sparse user x book matrix X (SciPy CSR/CSC, binary),
+  3. computes co-occurrence C = X^T X one block of book columns at a time,
+     sized so a block's result stays under RELATED_MEMORY_MB, and keeps the
+     top RELATED_TOP_K neighbours per book (raw co-occurrence or cosine
+     C_ij / sqrt(n_i * n_j)),
+  4. replaces `book_related` (one row per book, uid + score arrays) in a
+     single transaction with COPY, in RELATED_COPY_CHUNK row chunks as the
+     blocks are computed.
+
+Serving GET /api/v1/book/{book_uid}/related is one primary key lookup.
+Users with more than RELATED_MAX_USER_REVIEWS reviews (bulk accounts, bots)
+are skipped: they add O(n^2) pairs and little signal.
+"""
+
+import logging
+import time
+import uuid
+from array import array
+from itertools import islice
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import config
+from src.db.model import Review, BookRelated
+
+RELATED_COPY_COLUMNS = ["book_uid", "related_book_uids", "scores", "computed_at"]
+
+
+class ReviewPairs:
+    """(user row, book column) pairs, appended in user order into compact int32 arrays"""
+
+    def __init__(self, max_user_reviews: int) -> None:
+        self.max_user_reviews = max_user_reviews
+        self.rows = array("i")
+        self.cols = array("i")
+        self.book_index: Dict[uuid.UUID, int] = {}
+        self.book_uids: List[uuid.UUID] = []
+        self.users = 0
+        self.skipped_users = 0
+        self._user = None
+        self._user_cols = array("i")
+
+    def _flush_user(self) -> None:
+        if not self._user_cols:
+            return
+        if len(self._user_cols) > self.max_user_reviews:
+            self.skipped_users += 1
+        else:
+            self.rows.extend([self.users] * len(self._user_cols))
+            self.cols.extend(self._user_cols)
+            self.users += 1
+        self._user_cols = array("i")
+
+    def add(self, user_uid: uuid.UUID, book_uid: uuid.UUID) -> None:
+        if user_uid != self._user:
+            self._flush_user()
+            self._user = user_uid
+        col = self.book_index.get(book_uid)
+        if col is None:
+            col = self.book_index[book_uid] = len(self.book_uids)
+            self.book_uids.append(book_uid)
+        self._user_cols.append(col)
+
+    def matrix(self) -> sparse.csc_matrix:
+        self._flush_user()
+        rows = np.frombuffer(self.rows, dtype=np.int32)
+        cols = np.frombuffer(self.cols, dtype=np.int32)
+        return sparse.csc_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                                 shape=(self.users, len(self.book_uids)))
+
+
+def top_neighbours(matrix: sparse.csc_matrix, top_k: int, method: str, min_cooccurrence: int,
+                   memory_mb: int) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """Yield (book column, neighbour columns, scores) — best first — for every book with neighbours"""
+    n_books = matrix.shape[1]
+    if not n_books:
+        return
+    transposed = matrix.T.tocsr()
+    counts = np.asarray(matrix.sum(axis=0)).ravel()
+    # Worst case a block result is dense: n_books * block * (value + index)
+    block = max(1, min(n_books, memory_mb * 1024 * 1024 // (n_books * 8)))
+
+    for start in range(0, n_books, block):
+        cooccurrence = (transposed @ matrix[:, start:start + block]).tocsc()
+        for offset in range(cooccurrence.shape[1]):
+            book = start + offset
+            lo, hi = cooccurrence.indptr[offset], cooccurrence.indptr[offset + 1]
+            neighbours, values = cooccurrence.indices[lo:hi], cooccurrence.data[lo:hi]
+
+            keep = (neighbours != book) & (values >= min_cooccurrence)
+            neighbours, values = neighbours[keep], values[keep]
+            if not len(neighbours):
+                continue
+
+            if method == "cosine":
+                scores = values / np.sqrt(counts[neighbours] * counts[book])
+            else:
+                scores = values
+            if len(scores) > top_k:
+                best = np.argpartition(-scores, top_k)[:top_k]
+                neighbours, scores = neighbours[best], scores[best]
+            order = np.argsort(-scores, kind="stable")
+            yield book, neighbours[order], scores[order]
+
+
+class RelatedBooksJob:
+    async def load_pairs(self, session: AsyncSession) -> ReviewPairs:
+        pairs = ReviewPairs(config.RELATED_MAX_USER_REVIEWS)
+        statement = (select(Review.user_uid, Review.book_uid)
+                     .where(Review.user_uid.is_not(None), Review.book_uid.is_not(None))
+                     .order_by(Review.user_uid, Review.book_uid)
+                     .execution_options(yield_per=config.RELATED_FETCH_SIZE))
+        # Server side cursor: only one fetch of rows in memory at a time
+        result = await session.stream(statement)
+        async for partition in result.partitions():
+            for user_uid, book_uid in partition:
+                pairs.add(user_uid, book_uid)
+        return pairs
+
+    async def run(self, session: AsyncSession) -> int:
+        """Recompute book_related; returns the number of books that got neighbours"""
+        start_time = time.perf_counter()
+        pairs = await self.load_pairs(session)
+        # Don't sit idle in a transaction while computing
+        await session.commit()
+        matrix = pairs.matrix()
+        logging.info("Related books: %s pairs, %s users (%s skipped), %s books loaded in %.1fs",
+                     matrix.nnz, pairs.users, pairs.skipped_users, matrix.shape[1],
+                     time.perf_counter() - start_time)
+
+        # Readers keep seeing the previous results until this commits. Rows are
+        # computed one block at a time and COPYed RELATED_COPY_CHUNK at a time,
+        # so the full result set is never held in memory
+        connection = await session.connection()
+        await session.execute(delete(BookRelated))
+        raw_connection = await connection.get_raw_connection()
+        computed_at = datetime.now()
+        records = ((pairs.book_uids[book],
+                    [pairs.book_uids[neighbour] for neighbour in neighbours],
+                    scores.astype(float).tolist(),
+                    computed_at)
+                   for book, neighbours, scores in top_neighbours(matrix,
+                                                                  top_k=config.RELATED_TOP_K,
+                                                                  method=config.RELATED_METHOD,
+                                                                  min_cooccurrence=config.RELATED_MIN_COOCCURRENCE,
+                                                                  memory_mb=config.RELATED_MEMORY_MB))
+        written = 0
+        while chunk := list(islice(records, config.RELATED_COPY_CHUNK)):
+            await raw_connection.driver_connection.copy_records_to_table(
+                "book_related", records=chunk, columns=RELATED_COPY_COLUMNS)
+            written += len(chunk)
+        await session.commit()
+
+        logging.info("Related books: %s books written in %.1fs", written, time.perf_counter() - start_time)
+        return written
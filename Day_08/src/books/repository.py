@@ -0,0 +1,70 @@
+"""
+Read-only fast path for the hot book list endpoints.
+
+Selects only the columns of the `Book` response schema as plain core rows and
+encodes them straight to JSON bytes with orjson (only the `fields=` columns
+when a sparse fieldset is requested) — no ORM instances, identity
+map or selectin loads, and no response_model revalidation.
+"""
+
+from typing import Optional, Tuple
+from sqlalchemy import select, desc, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.model import Book
+from src.responses import dumps_json
+from .schema import Book as BookSchema
+
+books_table = Book.__table__
+
+# Same columns, same order as the Book response schema
+BOOK_KEYS = tuple(BookSchema.model_fields)
+
+
+def encode_rows(rows, keys: Tuple[str, ...] = BOOK_KEYS) -> bytes:
+    return dumps_json([dict(zip(keys, row)) for row in rows])
+
+
+def projection(fields: Optional[Tuple[str, ...]]) -> Tuple[str, ...]:
+    """Column names to select — every Book column, or just the sparse fieldset"""
+    return fields or BOOK_KEYS
+
+
+# Nearest titles and nearest authors, each an ordered GiST scan (<<-> = word
+# distance) that stops after :limit rows; `<%` keeps only real matches
+SUGGEST_QUERY = text("""
+    (SELECT uid, title, author, :q <<-> title AS distance
+     FROM books WHERE :q <% title
+     ORDER BY :q <<-> title LIMIT :limit)
+    UNION ALL
+    (SELECT uid, title, author, :q <<-> author AS distance
+     FROM books WHERE :q <% author
+     ORDER BY :q <<-> author LIMIT :limit)
+""")
+
+
+class BookReadRepository:
+    async def get_all_books_json(self, session: AsyncSession, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        keys = projection(fields)
+        statement = select(*(books_table.c[name] for name in keys)).order_by(desc(books_table.c.created_at))
+        result = await session.execute(statement)
+        return encode_rows(result.all(), keys)
+
+    async def get_user_books_json(self, user_uid: str, session: AsyncSession,
+                                  fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        keys = projection(fields)
+        statement = (select(*(books_table.c[name] for name in keys))
+                     .where(books_table.c.user_uid == user_uid)
+                     .order_by(desc(books_table.c.created_at)))
+        result = await session.execute(statement)
+        return encode_rows(result.all(), keys)
+
+    async def suggest_json(self, q: str, limit: int, session: AsyncSession) -> bytes:
+        """Best `limit` title/author matches for a (possibly misspelled) prefix"""
+        result = await session.execute(SUGGEST_QUERY, {"q": q, "limit": limit})
+        suggestions = {}
+        for uid, title, author, distance in sorted(result.all(), key=lambda row: row.distance):
+            # A book matching on both title and author keeps its best match
+            if uid not in suggestions:
+                suggestions[uid] = {"uid": uid, "title": title, "author": author,
+                                    "score": round(1 - distance, 4)}
+        return dumps_json(list(suggestions.values())[:limit])
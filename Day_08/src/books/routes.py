@@ -3,81 +3,280 @@ API routes for Book resource.
 Uses dependency injection to get the AsyncSession from src.db.main:get_session.
 """
 
-from fastapi import APIRouter, Depends, status, HTTPException
-from typing import List
+import uuid
+import orjson
+from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File, Query, Response, Request
+from typing import List, Literal, Optional
 from sqlmodel.ext.asyncio.session import AsyncSession
+from redis.exceptions import RedisError
 
 # Import the request/response schemas (Pydantic/SQLModel models)
-from .schema import Book, BookUpdate, BookCreateModel, BookDetailModel
+from .schema import Book, BookUpdate, BookCreateModel, BookDetailModel, BookImportModel, BookBatchRequest, BookBatchModel, TopBookModel, RelatedBookModel, BookSuggestionModel, BookDuplicateModel
 
 from src.books.service import BookService
-from src.db.main import get_session
+from src.books.repository import BookReadRepository
+from src.books.leaderboard import leaderboard
+from src.books.trending import get_trending_json
+from src.db.redis import redis_manager
+from src.books.fields import parse_fields, encode_book, book_to_dict
+from src.books.importer import BookImportService, ImportInProgress, SUPPORTED_FORMATS, detect_format
+from src.db.main import get_session, get_read_session, ReadSessionLocal
 from src.auth.dependencies import AccessTokenBearer, RoleChecker
 from src.exception import BookNotFound
+from src.responses import serialize_response, serializers, BooklyJSONResponse, dumps_json
+from src.singleflight import SingleFlight
+from src.idempotency import idempotent, request_fingerprint
 
 
 router = APIRouter()
 book_service = BookService()
+book_read_repository = BookReadRepository()
+book_import_service = BookImportService()
 access_token_bearier = AccessTokenBearer()
 role_checker = Depends(RoleChecker(['admin', 'user']))
+admin_checker = Depends(RoleChecker(['admin']))
+book_detail_flight = SingleFlight("book_detail")
+
+
+FIELDS_QUERY = Query(None, description="Comma separated fields to return, e.g. uid,title,author")
+
+
+async def load_book_detail_json(book_uid: str, fields=None) -> Optional[bytes]:
+    # Own session: the single-flight call may outlive the request that started it
+    async with ReadSessionLocal() as session:
+        book = await book_service.get_book(book_uid, session, fields)
+        if book is None:
+            return None
+        return encode_book(book, fields) if fields else serializers.dump_json(BookDetailModel, book)
 
 
 @router.get("/", response_model=List[Book], dependencies=[role_checker])
-async def get_all_books(session: AsyncSession = Depends(get_session),
+async def get_all_books(fields: Optional[str] = FIELDS_QUERY,
+                        session: AsyncSession = Depends(get_read_session),
                         token_details : dict = Depends(access_token_bearier)):
     """
-    GET /api/v1/book/
+    GET /api/v1/book/?fields=uid,title,author
     Return list of books
+    (ORM-free fast path: rows are encoded straight to JSON, response_model is only for the docs)
     """
     # print(token_details)
-    books = await book_service.get_all_books(session)
-    return books
+    books_json = await book_read_repository.get_all_books_json(session, parse_fields(fields))
+    return Response(content=books_json, media_type="application/json")
 
 
 
 @router.get("/user/{user_uid}", response_model=List[Book], dependencies=[role_checker])
 async def get_user_book_submission(user_uid : str,
-                        session: AsyncSession = Depends(get_session),
+                        fields: Optional[str] = FIELDS_QUERY,
+                        session: AsyncSession = Depends(get_read_session),
                         token_details : dict = Depends(access_token_bearier)):
     """
-    GET /api/v1/book/user/{user_uid}
+    GET /api/v1/book/user/{user_uid}?fields=uid,title,author
     Return list of books of user
+    (ORM-free fast path, see get_all_books)
     """
     # print(token_details)
-    books = await book_service.get_user_books(user_uid, session)
-    return books
+    books_json = await book_read_repository.get_user_books_json(user_uid, session, parse_fields(fields))
+    return Response(content=books_json, media_type="application/json")
 
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=Book,  dependencies=[role_checker])
 async def create_book(book_data: BookCreateModel, 
+                      request: Request,
                       session: AsyncSession = Depends(get_session),
                       token_details : dict = Depends(access_token_bearier)) -> dict:
     """
     POST /api/v1/book/
     Create and return the created book
+    Send an Idempotency-Key header to make retries safe (the first response is replayed).
     """
     user_id = token_details.get('user')['user_uid']
-    new_book = await book_service.create_book(book_data, user_id, session)
-    return new_book
+
+    async def create() -> Response:
+        new_book = await book_service.create_book(book_data, user_id, session)
+        return serialize_response(Book, new_book, status_code=status.HTTP_201_CREATED)
+
+    return await idempotent(request, user_id, request_fingerprint(book_data.model_dump_json()), create)
+
+
+@router.post("/import", response_model=BookImportModel, dependencies=[admin_checker])
+async def import_books(file: UploadFile = File(...),
+                       file_format: Optional[str] = Query(None, alias="format"),
+                       resume: Optional[uuid.UUID] = None,
+                       session: AsyncSession = Depends(get_session),
+                       token_details : dict = Depends(access_token_bearier)):
+    """
+    POST /api/v1/book/import?format=csv|ndjson&resume={import_uid}
+    Bulk-load books from a CSV / NDJSON upload with COPY.
+    Pass `resume` with the same file to continue an interrupted (deadline, disconnect) or
+    failed import. For very large catalogs use `python -m src.books.import_cli` instead.
+    """
+    if resume is not None:
+        job, _ = await book_import_service.get_import(resume, session)
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import Not Found")
+    else:
+        file_format = file_format or detect_format(file.filename or "")
+        if file_format not in SUPPORTED_FORMATS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Unsupported format, use one of {SUPPORTED_FORMATS}")
+        user_id = token_details.get('user')['user_uid']
+        job = await book_import_service.create_import(file.filename or "upload", file_format, user_id, session)
+
+    try:
+        await book_import_service.run_import(job, file.file, session)
+    except ImportInProgress:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Import is already running")
+
+    job, errors = await book_import_service.get_import(job.uid, session)
+    return BookImportModel(**job.model_dump(), errors=[e.model_dump() for e in errors])
+
+
+@router.get("/import/{import_uid}", response_model=BookImportModel, dependencies=[admin_checker])
+async def get_import_status(import_uid: uuid.UUID,
+                            session: AsyncSession = Depends(get_session),
+                            token_details : dict = Depends(access_token_bearier)):
+    """
+    GET /api/v1/book/import/{import_uid}
+    Progress of a bulk import and its first rejected rows
+    """
+    job, errors = await book_import_service.get_import(import_uid, session)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import Not Found")
+    return BookImportModel(**job.model_dump(), errors=[e.model_dump() for e in errors])
+
+
+@router.get("/top", response_model=List[TopBookModel])
+async def get_top_books(by: Literal["rating", "reviews"] = "rating",
+                        limit: int = Query(10, ge=1, le=100),
+                        token_details : dict = Depends(access_token_bearier)):
+    """
+    GET /api/v1/book/top?by=rating|reviews&limit=10
+    Top rated (Bayesian average) or most reviewed books, straight from the Redis
+    leaderboards — no database query (token check only, no role lookup).
+    Use POST /api/v1/book/batch to fetch the books themselves.
+    """
+    try:
+        return await leaderboard.top(by, limit)
+    except RedisError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Leaderboards are temporarily unavailable",
+                            headers={"Retry-After": "5"})
+
+
+@router.get("/trending", response_model=List[RelatedBookModel])
+async def get_trending_books(limit: int = Query(20, ge=1, le=100),
+                             token_details : dict = Depends(access_token_bearier)):
+    """
+    GET /api/v1/book/trending?limit=20
+    Books with the most recent review activity (exponentially decayed), as published
+    by the trending job — served from the Redis cache, never computed here.
+    """
+    try:
+        trending = orjson.loads(await get_trending_json(redis_manager.client))
+    except RedisError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Trending books are temporarily unavailable",
+                            headers={"Retry-After": "5"})
+    return BooklyJSONResponse(content=trending[:limit])
+
+
+@router.get("/suggest", response_model=List[BookSuggestionModel], dependencies=[role_checker])
+async def suggest_books(q: str = Query(..., min_length=2, max_length=100),
+                        limit: int = Query(10, ge=1, le=20),
+                        session: AsyncSession = Depends(get_read_session),
+                        token_details : dict = Depends(access_token_bearier)):
+    """
+    GET /api/v1/book/suggest?q=harr%20pot
+    As-you-type title / author suggestions, tolerant to small typos (pg_trgm word similarity)
+    """
+    suggestions_json = await book_read_repository.suggest_json(q, limit, session)
+    return Response(content=suggestions_json, media_type="application/json")
+
+
+@router.get("/duplicates", response_model=List[BookDuplicateModel], dependencies=[admin_checker])
+async def get_duplicate_books(canonical: Optional[uuid.UUID] = None,
+                              limit: int = Query(100, ge=1, le=1000),
+                              session: AsyncSession = Depends(get_read_session),
+                              token_details : dict = Depends(access_token_bearier)):
+    """
+    GET /api/v1/book/duplicates?canonical={book_uid}&limit=100
+    Near-duplicate books (similar title and author) found by the periodic dedupe job,
+    each with the older book it duplicates and the estimated similarity.
+    """
+    return await book_service.get_duplicates(session, canonical, limit)
+
+
+@router.post("/batch", response_model=BookBatchModel, dependencies=[role_checker])
+async def get_books_batch(batch: BookBatchRequest,
+                          fields: Optional[str] = FIELDS_QUERY,
+                          session: AsyncSession = Depends(get_read_session),
+                          token_details : dict = Depends(access_token_bearier)):
+    """
+    POST /api/v1/book/batch?fields=uid,title,reviews
+    Return up to BOOK_BATCH_MAX_SIZE books (with reviews) in one call, in request order.
+    Uids that don't exist are listed in `missing` instead of failing the whole batch.
+    """
+    selected = parse_fields(fields, allow_reviews=True)
+    book_uids = list(dict.fromkeys(batch.uids))
+    books = await book_service.get_books_by_uids(book_uids, session, selected)
+    found = {book.uid for book in books}
+    missing = [uid for uid in book_uids if uid not in found]
+    if selected:
+        return Response(content=dumps_json({"books": [book_to_dict(book, selected) for book in books],
+                                            "missing": missing}),
+                        media_type="application/json")
+    return serialize_response(BookBatchModel, {"books": books, "missing": missing})
 
 
 @router.get("/{book_uid}", response_model=BookDetailModel,  dependencies=[role_checker])
 async def get_book(book_uid: str, 
-                   session: AsyncSession = Depends(get_session),
+                   fields: Optional[str] = FIELDS_QUERY,
+                   session: AsyncSession = Depends(get_read_session),
                    token_details : dict = Depends(access_token_bearier)):
     """
-    GET /api/v1/book/{book_uid}
+    GET /api/v1/book/{book_uid}?fields=uid,title,reviews
     Return single book or 404
+    Concurrent requests for the same book share one query (single-flight),
+    unless this user must read their own recent writes from the primary.
     """
-    book = await book_service.get_book(book_uid, session)
+    selected = parse_fields(fields, allow_reviews=True)
+    if session.info.get("read_replica"):
+        flight_key = f"{book_uid}:{','.join(selected)}" if selected else book_uid
+        book_json = await book_detail_flight.do(flight_key, lambda: load_book_detail_json(book_uid, selected))
+        if book_json is None:
+            raise BookNotFound()
+        return Response(content=book_json, media_type="application/json")
+
+    book = await book_service.get_book(book_uid, session, selected)
+    if book and selected:
+        return Response(content=encode_book(book, selected), media_type="application/json")
     if book:
-        return book
+        return serialize_response(BookDetailModel, book)
     else:
         raise BookNotFound()
         # raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
 
 
+@router.get("/{book_uid}/related", response_model=List[RelatedBookModel], dependencies=[role_checker])
+async def get_related_books(book_uid: uuid.UUID,
+                            limit: int = Query(10, ge=1, le=100),
+                            session: AsyncSession = Depends(get_read_session),
+                            token_details : dict = Depends(access_token_bearier)):
+    """
+    GET /api/v1/book/{book_uid}/related?limit=10
+    "Readers also reviewed": books most often reviewed by the same users, best first.
+    Precomputed offline (src/books/related.py), so this is one primary key lookup.
+    """
+    related = await book_service.get_related_books(book_uid, session)
+    if related is None:
+        return []
+    return BooklyJSONResponse(content=[{"uid": uid, "score": score}
+                                       for uid, score in zip(related.related_book_uids[:limit],
+                                                             related.scores[:limit])])
+
+
 @router.patch("/{book_uid}", response_model=Book, dependencies=[role_checker])
 async def update_book(book_uid: str, 
                       book_update_data: BookUpdate, 
@@ -89,7 +288,7 @@ async def update_book(book_uid: str,
     """
     updated_book = await book_service.update_book(book_uid, book_update_data, session)
     if updated_book:
-        return updated_book
+        return serialize_response(Book, updated_book)
     else:
         raise BookNotFound()
         # raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
@@ -105,6 +304,7 @@ async def delete_book(book_uid: str,
     """
     book_delete = await book_service.delete_book(book_uid, session)
     if book_delete is not None:
+        await leaderboard.remove_book(book_uid)
         return None
     else:
         raise BookNotFound()
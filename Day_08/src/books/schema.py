@@ -1,8 +1,9 @@
-from typing import List
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 import uuid
 from datetime import datetime, date
 from src.reviews.schema import ReviweModel
+from src.config import config
 
 class Book(BaseModel):
     uid : uuid.UUID
@@ -19,6 +20,40 @@ class Book(BaseModel):
 class BookDetailModel(BaseModel):
     reviews : List[ReviweModel]
     
+class BookBatchRequest(BaseModel):
+    uids : List[uuid.UUID] = Field(min_length=1, max_length=config.BOOK_BATCH_MAX_SIZE)
+
+
+class BookBatchItem(Book):
+    reviews : List[ReviweModel]
+
+
+class BookBatchModel(BaseModel):
+    books : List[BookBatchItem]
+    missing : List[uuid.UUID]
+
+class TopBookModel(BaseModel):
+    uid : uuid.UUID
+    score : float
+    review_count : int
+    average_rating : Optional[float]
+
+class RelatedBookModel(BaseModel):
+    uid : uuid.UUID
+    score : float
+
+class BookDuplicateModel(BaseModel):
+    book_uid : uuid.UUID
+    canonical_book_uid : uuid.UUID
+    similarity : float
+    computed_at : datetime
+
+class BookSuggestionModel(BaseModel):
+    uid : uuid.UUID
+    title : str
+    author : str
+    score : float
+
 class BookCreateModel(BaseModel):
     title: str
     author: str
@@ -31,4 +66,30 @@ class BookUpdate(BaseModel):
     title : str
     publisher : str
     page_count : int
-    language : str
\ No newline at end of file
+    language : str
+
+class BookImportRow(BaseModel):
+    title : str
+    author : str
+    publisher : str
+    published_date : date
+    page_count : int
+    language : str
+
+
+class BookImportErrorModel(BaseModel):
+    row_number : int
+    error : str
+
+
+class BookImportModel(BaseModel):
+    uid : uuid.UUID
+    filename : str
+    file_format : str
+    status : str
+    rows_processed : int
+    rows_imported : int
+    rows_failed : int
+    created_at : datetime
+    updated_at : datetime
+    errors : List[BookImportErrorModel] = []
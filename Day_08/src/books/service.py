@@ -3,11 +3,19 @@ Service layer for Book-related business logic.
 This keeps DB logic separated from route handlers (clean architecture).
 """
 
+import uuid
+from typing import List, Optional, Tuple
+from fastapi import status
+from fastapi.exceptions import HTTPException
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select, desc
+from sqlalchemy import any_, bindparam, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from datetime import datetime
-from src.db.model import Book
+from src.db.model import Book, BookRelated, BookDuplicate
 from .schema import BookCreateModel, BookUpdate  # import your pydantic/sqlmodel schemas
+from .fields import load_options
+from .fingerprint import book_fingerprint
 
 
 class BookService:
@@ -25,22 +33,72 @@ class BookService:
         return result.all()
     
 
-    async def get_book(self, book_uid: str, session: AsyncSession):
+    async def get_book(self, book_uid: str, session: AsyncSession, fields: Optional[Tuple[str, ...]] = None):
         """
         Return a single book by uid or None if not found.
+        With `fields` (see fields.py) only those columns/relationships are loaded.
         """
         statement = select(Book).where(Book.uid == book_uid)
+        if fields:
+            statement = statement.options(*load_options(fields))
         result = await session.exec(statement)
         book = result.first()
         return book if book is not None else None
 
+    async def get_books_by_uids(self, book_uids: List[uuid.UUID], session: AsyncSession,
+                                fields: Optional[Tuple[str, ...]] = None):
+        """
+        Return the books with the given uids, in the same order (unknown uids are skipped).
+        One `uid = ANY(:uids)` query — a single array parameter, so the statement is the
+        same whatever the batch size — plus one selectin query for all their reviews.
+        """
+        uids_param = bindparam("uids", value=list(book_uids), type_=ARRAY(Book.__table__.c.uid.type))
+        statement = select(Book).where(Book.uid == any_(uids_param))
+        if fields:
+            statement = statement.options(*load_options(fields))
+        result = await session.exec(statement)
+        books = {book.uid: book for book in result.all()}
+        return [books[uid] for uid in book_uids if uid in books]
+
+    async def get_related_books(self, book_uid: uuid.UUID, session: AsyncSession):
+        """
+        Precomputed neighbours of a book (one primary key lookup), or None if the
+        related-books job found none.
+        """
+        return await session.get(BookRelated, book_uid)
+
+    async def get_duplicates(self, session: AsyncSession, canonical_book_uid: Optional[uuid.UUID] = None,
+                             limit: int = 100):
+        """
+        Near-duplicates found by the last dedupe job run, grouped by their canonical (oldest) book.
+        """
+        statement = select(BookDuplicate).order_by(BookDuplicate.canonical_book_uid, BookDuplicate.book_uid)
+        if canonical_book_uid is not None:
+            statement = statement.where(BookDuplicate.canonical_book_uid == canonical_book_uid)
+        result = await session.exec(statement.limit(limit))
+        return result.all()
+
     async def create_book (self, book_data: BookCreateModel, user_uid : str, session: AsyncSession):
         """
         Create a Book from BookCreateModel, convert published_date string to datetime,
         save and return the created Book (with uid, timestamps).
+        Raises 409 if a book with the same normalized title/author/publisher exists.
         """
         book_data_dict = book_data.model_dump()
+        fingerprint = book_fingerprint(book_data.title, book_data.author, book_data.publisher)
+        if session.bind.dialect.name == "postgresql":
+            # Concurrent creates of the same book wait here until the first one commits
+            # (the lock is released with the transaction), so only one of them inserts
+            await session.exec(select(func.pg_advisory_xact_lock(func.hashtext(fingerprint))))
+        # One lookup on ix_books_fingerprint; near-duplicates are left to the dedupe job
+        existing = (await session.exec(
+            select(Book.uid).where(Book.fingerprint == fingerprint).limit(1))).first()
+        if existing is not None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail={"message": "Book already exists", "book_uid": str(existing)})
+
         new_book = Book(**book_data_dict)
+        new_book.fingerprint = fingerprint
 
         # Convert published_date string ("YYYY-MM-DD") to datetime (optional)
         new_book.published_date = datetime.strptime(book_data_dict['published_date'], "%Y-%m-%d")
@@ -48,9 +106,9 @@ class BookService:
         new_book.user_uid = user_uid
         
         session.add(new_book)
+        # uid is generated in Python, created_at/updated_at come back from
+        # INSERT ... RETURNING (eager_defaults) — no refresh SELECT needed
         await session.commit()
-        # refresh so DB-generated fields (uid, created_at) are loaded into new_book
-        await session.refresh(new_book)
         return new_book
 
     async def update_book(self, book_uid: str, update_data: BookUpdate, session: AsyncSession):
@@ -63,9 +121,11 @@ class BookService:
             update_data_dict = update_data.model_dump(exclude_unset=True)
             for k, v in update_data_dict.items():
                 setattr(book_update, k, v)
+            book_update.fingerprint = book_fingerprint(book_update.title, book_update.author,
+                                                       book_update.publisher)
 
+            # updated_at comes back from UPDATE ... RETURNING
             await session.commit()
-            await session.refresh(book_update)
             return book_update
         else:
             return None
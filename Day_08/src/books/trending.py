@@ -0,0 +1,138 @@
+"""
+"Trending now": books ranked by exponentially decayed review activity.
+
+A Celery beat job (src/celery_task.py, every TRENDING_INTERVAL seconds) reads
+only the reviews created since its watermark (created_at, uid) — a range scan
+of ix_reviews_created_at_uid — and adds each one to its book's score in a Redis
+sorted set. Old activity fades with a half-life of TRENDING_HALF_LIFE_HOURS.
+
+Scores use forward decay: a review at time t adds exp((t - landmark) / tau)
+instead of decaying every stored score on every run, so a run costs O(new
+reviews). When the weights get large, all scores are rescaled once to a new
+landmark. Score updates and the watermark move together in one MULTI, so a
+crashed run neither loses nor double counts reviews.
+
+Each run then publishes the top TRENDING_TOP_N (decayed to "now") as one JSON
+blob that GET /api/v1/book/trending returns as is.
+"""
+
+import logging
+import math
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+import orjson
+from redis.asyncio import Redis
+from sqlalchemy import select, func, tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import config
+from src.db.model import Review
+from src.db.redis import RELEASE_LOCK
+
+SCORES_KEY = "trending:scores"
+LANDMARK_KEY = "trending:landmark"
+WATERMARK_KEY = "trending:watermark"
+TOP_KEY = "trending:top"
+LOCK_KEY = "trending:lock"
+
+reviews_table = Review.__table__
+
+
+def decay_tau() -> float:
+    """Seconds for a weight to shrink by e (from the half-life)"""
+    return config.TRENDING_HALF_LIFE_HOURS * 3600 / math.log(2)
+
+
+async def get_trending_json(redis: Redis) -> bytes:
+    return await redis.get(TOP_KEY) or b"[]"
+
+
+class TrendingJob:
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    async def _load_state(self, now: datetime) -> Tuple[datetime, Optional[Tuple[datetime, uuid.UUID]]]:
+        landmark, watermark = await self.redis.mget(LANDMARK_KEY, WATERMARK_KEY)
+        landmark = datetime.fromisoformat(landmark.decode()) if landmark else now
+        if watermark:
+            created_at, uid = orjson.loads(watermark)
+            watermark = (datetime.fromisoformat(created_at), uuid.UUID(uid))
+        return landmark, watermark
+
+    async def _rescale(self, landmark: datetime, new_landmark: datetime) -> None:
+        factor = math.exp(-(new_landmark - landmark).total_seconds() / decay_tau())
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zunionstore(SCORES_KEY, {SCORES_KEY: factor})
+            pipe.zremrangebyscore(SCORES_KEY, "-inf", config.TRENDING_MIN_SCORE)
+            pipe.set(LANDMARK_KEY, new_landmark.isoformat())
+            await pipe.execute()
+
+    async def run(self, session: AsyncSession) -> int:
+        """Fold new reviews into the scores and publish the top list; returns the number of reviews read"""
+        # Only one run at a time, even if beat fires again while this one is slow
+        token = uuid.uuid4().hex
+        if not await self.redis.set(LOCK_KEY, token, nx=True, ex=config.TRENDING_INTERVAL * 10):
+            return 0
+        try:
+            return await self._run(session)
+        finally:
+            await self.redis.register_script(RELEASE_LOCK)(keys=[LOCK_KEY], args=[token])
+
+    async def _db_now(self, session: AsyncSession) -> datetime:
+        # Database clock in the same form as created_at (now() stored as TIMESTAMP)
+        return (await session.execute(select(func.localtimestamp()))).scalar_one()
+
+    async def _run(self, session: AsyncSession) -> int:
+        now = await self._db_now(session)
+        # Rows newer than the lag may still belong to transactions that commit
+        # later with an older created_at
+        upper = now - timedelta(seconds=config.TRENDING_SAFETY_LAG)
+
+        landmark, watermark = await self._load_state(now)
+        if (upper - landmark).total_seconds() / decay_tau() > config.TRENDING_RESCALE_AFTER:
+            await self._rescale(landmark, upper)
+            landmark = upper
+        if watermark is None:
+            # First run: a short look back, not the whole table
+            watermark = (upper - timedelta(hours=config.TRENDING_HALF_LIFE_HOURS * 4), uuid.UUID(int=0))
+
+        tau = decay_tau()
+        processed = 0
+        while True:
+            statement = (select(reviews_table.c.created_at, reviews_table.c.uid, reviews_table.c.book_uid)
+                         .where(tuple_(reviews_table.c.created_at, reviews_table.c.uid) > tuple_(*watermark),
+                                reviews_table.c.created_at <= upper)
+                         .order_by(reviews_table.c.created_at, reviews_table.c.uid)
+                         .limit(config.TRENDING_CHUNK_SIZE))
+            rows = (await session.execute(statement)).all()
+            if not rows:
+                break
+
+            increments = {}
+            for created_at, _, book_uid in rows:
+                if book_uid is not None:
+                    weight = math.exp((created_at - landmark).total_seconds() / tau)
+                    increments[str(book_uid)] = increments.get(str(book_uid), 0.0) + weight
+            watermark = (rows[-1][0], rows[-1][1])
+
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for book_uid, weight in increments.items():
+                    pipe.zincrby(SCORES_KEY, weight, book_uid)
+                pipe.set(LANDMARK_KEY, landmark.isoformat())
+                pipe.set(WATERMARK_KEY, orjson.dumps([watermark[0].isoformat(), str(watermark[1])]))
+                await pipe.execute()
+            processed += len(rows)
+
+        await self.publish(landmark, now)
+        logging.info("Trending: %s new reviews folded in", processed)
+        return processed
+
+    async def publish(self, landmark: datetime, now: datetime) -> None:
+        # Keep the set bounded: the long tail can't reach the top anyway
+        await self.redis.zremrangebyrank(SCORES_KEY, 0, -config.TRENDING_MAX_BOOKS - 1)
+        top = await self.redis.zrevrange(SCORES_KEY, 0, config.TRENDING_TOP_N - 1, withscores=True)
+        # Scores relative to `now`: roughly the number of recent reviews
+        scale = math.exp(-(now - landmark).total_seconds() / decay_tau())
+        payload = orjson.dumps([{"uid": uid.decode(), "score": round(score * scale, 4)}
+                                for uid, score in top if score * scale >= config.TRENDING_MIN_SCORE])
+        await self.redis.set(TOP_KEY, payload, ex=config.TRENDING_INTERVAL * 10)
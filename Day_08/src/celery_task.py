@@ -1,5 +1,11 @@
+from contextlib import asynccontextmanager
 from celery import Celery
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel.ext.asyncio.session import AsyncSession
 from src.mail import mail, create_message
+from src.config import config
+from src.db.redis import RedisManager
 from asgiref.sync import async_to_sync
 
 c_app = Celery()
@@ -12,4 +18,80 @@ def send_email(recipients: list[str], subject: str, body: str):
     message = create_message(recipients=recipients, subject=subject, body=body)
     
     async_to_sync(mail.send_message)(message)
-    print("Email sent")
\ No newline at end of file
+    print("Email sent")
+
+
+@asynccontextmanager
+async def _job_session():
+    # Own engine: the app's pool belongs to another event loop
+    engine = create_async_engine(config.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with AsyncSession(engine) as session:
+            yield session
+    finally:
+        await engine.dispose()
+
+
+@asynccontextmanager
+async def _job_redis():
+    # Own manager (pool, metrics, breaker, timeouts) for the same reason as
+    # _job_session: the app's pool belongs to another event loop
+    manager = RedisManager(
+        url=config.REDIS_URL,
+        max_connections=config.REDIS_MAX_CONNECTIONS,
+        pool_timeout=config.REDIS_POOL_TIMEOUT,
+        socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=config.REDIS_HEALTH_CHECK_INTERVAL,
+    )
+    try:
+        yield manager.client
+    finally:
+        await manager.close()
+
+
+async def _reconcile_leaderboards() -> int:
+    from src.books.leaderboard import Leaderboard
+    async with _job_redis() as redis, _job_session() as session:
+        return await Leaderboard(redis).rebuild(session)
+
+
+@c_app.task()
+def reconcile_leaderboards():
+    books = async_to_sync(_reconcile_leaderboards)()
+    print(f"Leaderboards rebuilt for {books} books")
+
+
+async def _compute_related_books() -> int:
+    from src.books.related import RelatedBooksJob
+    async with _job_session() as session:
+        return await RelatedBooksJob().run(session)
+
+
+@c_app.task()
+def compute_related_books():
+    books = async_to_sync(_compute_related_books)()
+    print(f"Related books computed for {books} books")
+
+
+async def _update_trending_books() -> int:
+    from src.books.trending import TrendingJob
+    async with _job_redis() as redis, _job_session() as session:
+        return await TrendingJob(redis).run(session)
+
+
+@c_app.task()
+def update_trending_books():
+    reviews = async_to_sync(_update_trending_books)()
+    print(f"Trending books updated with {reviews} new reviews")
+
+
+async def _find_duplicate_books() -> int:
+    from src.books.dedupe import DuplicateBooksJob
+    async with _job_session() as session:
+        return await DuplicateBooksJob().run(session)
+
+
+@c_app.task()
+def find_duplicate_books():
+    books = async_to_sync(_find_duplicate_books)()
+    print(f"Duplicate detection found {books} duplicate books")
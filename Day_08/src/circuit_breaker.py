@@ -0,0 +1,71 @@
+"""
+Circuit breaker.
+
+closed    -> calls go through; `failure_threshold` consecutive failures open it
+open      -> calls fail fast for `reset_timeout` seconds
+half_open -> a single probe call is let through; success closes the circuit,
+             failure opens it again
+
+State transitions are exported as metrics (circuit_breaker_transitions /
+circuit_breaker_state on /metrics).
+"""
+
+import logging
+import time
+from src.metrics import registry
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+breaker_transitions = registry.counter("circuit_breaker_transitions")
+breaker_state = registry.gauge("circuit_breaker_state")
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        breaker_state.set(STATE_VALUES[CLOSED], name)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logging.warning("Circuit breaker %s: %s -> %s", self.name, self.state, state)
+        breaker_transitions.inc(self.name, self.state, state)
+        breaker_state.set(STATE_VALUES[state], self.name)
+        self.state = state
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self._transition(HALF_OPEN)
+        # half open: only one probe at a time
+        if self.probe_in_flight:
+            return False
+        self.probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.probe_in_flight = False
+        self._transition(CLOSED)
+
+    def record_cancelled(self) -> None:
+        # Caller gave up (not the dependency's fault) — free the probe slot
+        self.probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._transition(OPEN)
@@ -0,0 +1,124 @@
+"""
+Response compression (gzip, brotli, zstd) negotiated through Accept-Encoding.
+
+- Bodies below COMPRESSION_MIN_SIZE are sent as they are.
+- Bodies above COMPRESSION_THREAD_THRESHOLD are compressed in the threadpool
+  so a big book list does not block the event loop.
+- Compressed variants are kept in an LRU keyed by the body's hash and bounded
+  by total compressed bytes (COMPRESSION_CACHE_MAX_BYTES), so the same hot
+  payload (e.g. a cached book detail) is compressed only once.
+"""
+
+import gzip
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from src.config import config
+from src.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+compression_cache_hits = registry.counter("compression_cache")
+
+
+def _zstd_compress(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(body)
+
+
+# Server preference order; levels are tuned for dynamic (per request) compression
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=4)
+if zstandard is not None:
+    COMPRESSORS["zstd"] = _zstd_compress
+COMPRESSORS["gzip"] = lambda body: gzip.compress(body, compresslevel=5)
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the best encoding we support from an Accept-Encoding header
+    (highest q-value first, then our preference order).
+    """
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name] = q
+
+    best, best_q = None, 0.0
+    for name in COMPRESSORS:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressedCache:
+    """LRU of compressed variants keyed by (body hash, encoding), bounded by total size"""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[Tuple[bytes, str], bytes]" = OrderedDict()
+
+    def get(self, key: Tuple[bytes, str]) -> Optional[bytes]:
+        compressed = self.entries.get(key)
+        if compressed is not None:
+            self.entries.move_to_end(key)
+        return compressed
+
+    def set(self, key: Tuple[bytes, str], compressed: bytes) -> None:
+        # One huge body would evict everything else for a single entry
+        if len(compressed) > self.max_bytes // 4:
+            return
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self.entries[key] = compressed
+        self.size += len(compressed)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+compressed_cache = CompressedCache(config.COMPRESSION_CACHE_MAX_BYTES)
+
+
+async def compress(body: bytes, encoding: str) -> bytes:
+    key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+    compressed = compressed_cache.get(key)
+    if compressed is not None:
+        compression_cache_hits.inc(encoding, "hit")
+        return compressed
+
+    compression_cache_hits.inc(encoding, "miss")
+    compressor = COMPRESSORS[encoding]
+    if len(body) >= config.COMPRESSION_THREAD_THRESHOLD:
+        compressed = await run_in_threadpool(compressor, body)
+    else:
+        compressed = compressor(body)
+
+    compressed_cache.set(key, compressed)
+    return compressed
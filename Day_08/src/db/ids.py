@@ -0,0 +1,39 @@
+"""
+Time-ordered UUIDv7 primary keys (RFC 9562).
+
+The first 48 bits are the unix time in milliseconds, so new rows land at the
+right-hand edge of the primary key B-tree instead of on random pages, and uid
+order roughly follows created_at. The next 12 bits are a counter (randomly
+seeded every millisecond) so ids made in the same millisecond stay ordered.
+"""
+
+import os
+import time
+import uuid
+import threading
+
+_lock = threading.Lock()
+_last_timestamp = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    global _last_timestamp, _counter
+
+    with _lock:
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp > _last_timestamp:
+            _last_timestamp = timestamp
+            # Seed in the lower half so there is room to count up
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter overflow (or clock went back): borrow the next millisecond
+                _last_timestamp += 1
+                _counter = 0
+        timestamp, counter = _last_timestamp, _counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & 0x3FFF_FFFF_FFFF_FFFF
+    value = (timestamp << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b
+    return uuid.UUID(int=value)
@@ -1,13 +1,29 @@
 """
 This file manages the database connection and initialization logic.
 It uses SQLModel + SQLAlchemy's async engine to connect to PostgreSQL.
+
+Two kinds of sessions are handed out:
+  - get_session       -> primary (all writes, and anything that must be fresh)
+  - get_read_session  -> read replica (DATABASE_REPLICA_URL), unless the same
+                         user wrote within READ_YOUR_WRITES_WINDOW seconds
+
+Inside a request every transaction gets `SET LOCAL statement_timeout` from the
+request deadline (src/deadline.py), so PostgreSQL stops the query too.
 """
 
+import logging
+from typing import Optional
+from fastapi import Request
 from sqlmodel.ext.asyncio.session import AsyncSession  # ✅ from SQLModel
 from sqlmodel import SQLModel
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 from src.config import config  # or wherever your DATABASE_URL lives
+from src.db.redis import mark_recent_write, has_recent_write
+from src.auth.utils import decode_token
+from src.db.profiler import install_query_profiler
+from src import deadline
 
 
 # ✅ Create an async engine (the correct function)
@@ -19,6 +35,55 @@ async_engine = create_async_engine(
     echo=False,            # Logs SQL queries (useful while developing)
 )
 
+# Read replica engine — without DATABASE_REPLICA_URL the primary plays both roles
+replica_engine = (
+    create_async_engine(config.DATABASE_REPLICA_URL, echo=False)
+    if config.DATABASE_REPLICA_URL else async_engine
+)
+
+# Count statements / DB time per request (see src/db/profiler.py)
+install_query_profiler(async_engine)
+install_query_profiler(replica_engine)
+
+class PrimarySession(AsyncSession):
+    """
+    Session on the primary. When get_session has set info["ryw_user_uid"], a
+    commit that writes first marks the user for read-your-writes, so the marker
+    is in place before the response (and the user's next read) can go out.
+    """
+
+    async def commit(self) -> None:
+        sync_session = self.sync_session
+        user_uid = sync_session.info.get("ryw_user_uid")
+        if user_uid and (sync_session.info.get("has_writes")
+                         or sync_session.new or sync_session.dirty or sync_session.deleted):
+            try:
+                await mark_recent_write(user_uid, config.READ_YOUR_WRITES_WINDOW)
+            except Exception as e:
+                logging.exception(e)
+        await super().commit()
+
+
+# Session factories are built once, not per request
+SessionLocal = sessionmaker(async_engine, class_=PrimarySession, expire_on_commit=False)
+ReadSessionLocal = sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_write(session, flush_context) -> None:
+    # A flush only happens when there are pending INSERT/UPDATE/DELETEs
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_deadline(session, transaction, connection) -> None:
+    request_remaining = deadline.remaining()
+    if request_remaining is None or connection.dialect.name != "postgresql":
+        return
+    # LOCAL -> reset at commit/rollback, never leaks to the next user of the pooled connection
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(int(request_remaining * 1000), 1)}")
+
+
 # This function will be called at app startup to create tables if they don't exist.
 async def init_db() -> None:
     async with async_engine.begin() as conn:
@@ -28,23 +93,64 @@ async def init_db() -> None:
         # result = await conn.execute(statement)
         # print(result.all())
 
+        # Book title/author trigram indexes use pg_trgm
+        await conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
         # Create all tables defined by SQLModel models (Book, etc.)
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
+def _request_user_uid(request: Request) -> Optional[str]:
+    """
+    Return the user_uid from the request's bearer token (no blocklist check —
+    this only decides which database to read from, auth is done by TokenBearer).
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        token_data = decode_token(token)
+    except Exception:
+        return None
+    if not token_data:
+        return None
+    return token_data.get("user", {}).get("user_uid")
+
+
 # Dependency function to provide an AsyncSession to FastAPI routes
-async def get_session() -> AsyncSession:
+async def get_session(request: Request) -> AsyncSession:
     """
     Usage in routes:
         async def route(session: AsyncSession = Depends(get_session)):
             ...
-    This yields a session that will be closed automatically after the request.
+    This yields a primary session that will be closed automatically after the request.
+    If the request writes anything, the user is pinned to the primary for
+    READ_YOUR_WRITES_WINDOW seconds — marked before the commit (PrimarySession),
+    not in teardown, which may run after the response has been sent.
     """
-    SessionLocal = sessionmaker(
-        async_engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
-
     async with SessionLocal() as session:
+        if replica_engine is not async_engine:
+            session.info["ryw_user_uid"] = _request_user_uid(request)
+        yield session
+
+
+async def get_read_session(request: Request) -> AsyncSession:
+    """
+    Same as get_session but reads from the replica, unless the caller
+    wrote within the read-your-writes window.
+    """
+    session_factory = ReadSessionLocal
+    if replica_engine is not async_engine:
+        user_uid = _request_user_uid(request)
+        try:
+            if user_uid and await has_recent_write(user_uid):
+                session_factory = SessionLocal
+        except Exception as e:
+            # Can't tell whether the user wrote recently -> play safe
+            logging.exception(e)
+            session_factory = SessionLocal
+
+    async with session_factory() as session:
+        # Lets routes know the data may be shared between users (see src/singleflight.py)
+        session.info["read_replica"] = session_factory is ReadSessionLocal
         yield session
@@ -5,7 +5,9 @@ from datetime import datetime, date
 from src.db import model
 import sqlalchemy.dialects.postgresql as pg
 from sqlmodel import SQLModel, Field, Column, Relationship
+from sqlalchemy import func, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
+from src.db.ids import uuid7
 
 
 
@@ -13,11 +15,19 @@ from sqlalchemy.dialects.postgresql import UUID
 class Book(SQLModel, table=True):
     # Explicitly specify table name in the DB
     __tablename__ = "books"
+    # Fetch server-generated columns with RETURNING instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+    # Trigram indexes for GET /api/v1/book/suggest (needs the pg_trgm extension)
+    __table_args__ = (
+        Index("ix_books_title_trgm", "title", postgresql_using="gist", postgresql_ops={"title": "gist_trgm_ops"}),
+        Index("ix_books_author_trgm", "author", postgresql_using="gist", postgresql_ops={"author": "gist_trgm_ops"}),
+    )
 
     # Unique ID column (Primary Key) using PostgreSQL UUID type
+    # UUIDv7 is time-ordered, so inserts append to the end of the PK index
     uid: uuid.UUID = Field(
-        default_factory=uuid.uuid4,
-        sa_column=Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+        default_factory=uuid7,
+        sa_column=Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     )
     # Basic columns — SQLModel will map these to appropriate SQL types
     title: str
@@ -26,13 +36,16 @@ class Book(SQLModel, table=True):
     published_date: date
     page_count: int
     language: str
+    # sha1 of normalized title/author/publisher (src/books/fingerprint.py) for duplicate checks on insert
+    fingerprint: Optional[str] = Field(default=None, sa_column=Column(pg.VARCHAR(40), index=True, nullable=True))
 
     # For establishing relationship between ueers and books
     user_uid: Optional[uuid.UUID] = Field(default=None, foreign_key="users.uid")
     
-    # Timestamps: using PostgreSQL TIMESTAMP column with defaults
-    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
-    updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
+    # Timestamps: filled by PostgreSQL (server defaults) and sent back with
+    # INSERT/UPDATE ... RETURNING, so no refresh SELECT is needed afterwards
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, server_default=func.now()))
+    updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, server_default=func.now(), onupdate=func.now()))
     
     user: Optional["User"] = Relationship(back_populates="books")
     reviews: List["Review"] = Relationship(back_populates="book", sa_relationship_kwargs={"lazy": "selectin"})
@@ -46,8 +59,10 @@ class Book(SQLModel, table=True):
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    # Fetch server-generated columns with RETURNING instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
     uid: uuid.UUID = Field(
-        sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid.uuid4)
+        sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid7)
     )
     username: str
     email: str
@@ -58,8 +73,8 @@ class User(SQLModel, table=True):
     password_hash: str = Field(
         sa_column=Column(pg.VARCHAR, nullable=False), exclude=True
     )
-    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
-    update_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, server_default=func.now()))
+    update_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, server_default=func.now(), onupdate=func.now()))
     
     books: List["Book"] = Relationship(back_populates="user",
                                              sa_relationship_kwargs={"lazy":"selectin"})
@@ -74,9 +89,20 @@ class User(SQLModel, table=True):
     
 class Review(SQLModel, table=True):
     __tablename__ = "reviews"
+    # Fetch server-generated columns with RETURNING instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+    # Keyset pagination of a book's reviews (src/reviews/repository.py)
+    __table_args__ = (
+        Index("ix_reviews_book_uid_created_at", "book_uid", "created_at", "uid"),
+        Index("ix_reviews_book_uid_rating", "book_uid", "rating", "created_at", "uid"),
+        # Incremental scans by the trending job (src/books/trending.py)
+        Index("ix_reviews_created_at_uid", "created_at", "uid"),
+        # One review per user per book (ReviewService upserts on it)
+        UniqueConstraint("user_uid", "book_uid", name="uq_reviews_user_uid_book_uid"),
+    )
 
     uid: uuid.UUID = Field(
-        sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid.uuid4)
+        sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid7)
     )
 
     rating: int = Field(lt=5)
@@ -85,11 +111,76 @@ class Review(SQLModel, table=True):
     user_uid: Optional[uuid.UUID] = Field(default=None, foreign_key="users.uid")
     book_uid: Optional[uuid.UUID] = Field(default=None, foreign_key="books.uid")
 
-    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
-    updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))  # ← FIXED
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, server_default=func.now()))
+    updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, server_default=func.now(), onupdate=func.now()))  # ← FIXED
 
     user: Optional["User"] = Relationship(back_populates="reviews")
     book: Optional["Book"] = Relationship(back_populates="reviews")
 
     def __repr__(self):
         return f"<Review for {self.book_uid} by {self.user_uid}>"
+
+
+
+class BookImport(SQLModel, table=True):
+    """Progress of a bulk book import — updated in the same transaction as each COPY chunk"""
+    __tablename__ = "book_imports"
+
+    uid: uuid.UUID = Field(
+        sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid7)
+    )
+    filename: str
+    file_format: str
+    status: str = Field(default="running")
+    rows_processed: int = Field(default=0)
+    rows_imported: int = Field(default=0)
+    rows_failed: int = Field(default=0)
+
+    user_uid: Optional[uuid.UUID] = Field(default=None, foreign_key="users.uid")
+
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
+    updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now, onupdate=datetime.now))
+
+    def __repr__(self):
+        return f"<BookImport {self.filename} ({self.status})>"
+
+
+class BookImportError(SQLModel, table=True):
+    """One rejected row of a bulk import"""
+    __tablename__ = "book_import_errors"
+
+    uid: uuid.UUID = Field(
+        sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid7)
+    )
+    import_uid: uuid.UUID = Field(foreign_key="book_imports.uid", index=True)
+    row_number: int
+    error: str
+
+    def __repr__(self):
+        return f"<BookImportError row {self.row_number}>"
+
+
+class BookRelated(SQLModel, table=True):
+    """Precomputed "readers also reviewed" neighbours of a book, best first (src/books/related.py)"""
+    __tablename__ = "book_related"
+
+    book_uid: uuid.UUID = Field(sa_column=Column(pg.UUID, primary_key=True))
+    related_book_uids: List[uuid.UUID] = Field(sa_column=Column(pg.ARRAY(pg.UUID), nullable=False))
+    scores: List[float] = Field(sa_column=Column(pg.ARRAY(pg.REAL), nullable=False))
+    computed_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, nullable=False))
+
+    def __repr__(self):
+        return f"<BookRelated {self.book_uid}>"
+
+
+class BookDuplicate(SQLModel, table=True):
+    """A book found to be a near-duplicate of an older (canonical) one (src/books/dedupe.py)"""
+    __tablename__ = "book_duplicates"
+
+    book_uid: uuid.UUID = Field(sa_column=Column(pg.UUID, primary_key=True))
+    canonical_book_uid: uuid.UUID = Field(sa_column=Column(pg.UUID, nullable=False, index=True))
+    similarity: float = Field(sa_column=Column(pg.REAL, nullable=False))
+    computed_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, nullable=False))
+
+    def __repr__(self):
+        return f"<BookDuplicate {self.book_uid} of {self.canonical_book_uid}>"
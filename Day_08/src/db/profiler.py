@@ -0,0 +1,88 @@
+"""
+Per-request SQL profiler.
+Engine event hooks count statements and accumulate database time into a
+QueryStats object stored in a ContextVar (set by the middleware for every
+request). Statements slower than SLOW_QUERY_THRESHOLD_MS are logged with their
+parameters and, for SELECTs, the EXPLAIN (ANALYZE, BUFFERS) plan.
+"""
+
+import time
+import logging
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.config import config
+
+slow_query_logger = logging.getLogger("bookly.slow_query")
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+
+# None outside of a request (startup, celery, scripts) -> nothing is recorded
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def _explain(conn, statement, parameters) -> str:
+    # Raw DBAPI cursor so the EXPLAIN itself does not go through these hooks.
+    # ANALYZE really runs the statement again, so only SELECTs are explained.
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return "(not explained: not a SELECT)"
+    # The savepoint keeps a failing EXPLAIN from aborting the request's transaction.
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            return "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    finally:
+        cursor.close()
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += duration
+
+    if config.SLOW_QUERY_THRESHOLD_MS and duration * 1000 >= config.SLOW_QUERY_THRESHOLD_MS:
+        plan = ""
+        if config.SLOW_QUERY_EXPLAIN:
+            try:
+                plan = _explain(conn, statement, parameters)
+            except Exception as e:
+                plan = f"(EXPLAIN failed: {e})"
+        slow_query_logger.warning("Slow query (%.1f ms): %s\nparameters: %r\n%s",
+                                  duration * 1000, statement, parameters, plan)
+
+
+def handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute — drop their start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def install_query_profiler(engine: AsyncEngine) -> None:
+    """Attach the profiling hooks to an async engine (idempotent)"""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(sync_engine, "handle_error", handle_error)
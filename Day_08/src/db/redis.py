@@ -1,20 +1,277 @@
-from redis.asyncio import Redis
+"""
+Single Redis connection manager for the whole app.
+Every Redis user in src/ goes through `redis_manager.client`, which shares one
+sized, blocking connection pool per worker (hiredis parser, periodic health
+checks) and records per-command latency and error metrics.
+
+Every command, and every pipeline execute(), runs under a deadline
+(REDIS_COMMAND_TIMEOUT, or a tighter one set with `redis_timeout(...)`, capped
+by the request deadline) and through a circuit breaker, so a slow Redis fails
+fast instead of hanging requests. Revoked JTIs are also replicated into
+a local copy that answers blocklist checks while the circuit is open.
+"""
+
+import asyncio
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+from fastapi import status
+from fastapi.exceptions import HTTPException
+from redis.asyncio import Redis, BlockingConnectionPool
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError, ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+from redis.utils import HIREDIS_AVAILABLE
 from src.config import config
+from src.metrics import registry
+from src.circuit_breaker import CircuitBreaker
+from src import deadline
 
 JTI_EXPIRY = 3600
 
-token_block_list = Redis.from_url(config.REDIS_URL)
+redis_command_latency = registry.histogram("redis_command_seconds")
+redis_command_errors = registry.counter("redis_command_errors")
+
+
+# Per-call deadline override (seconds) for the current task
+current_redis_timeout: ContextVar[Optional[float]] = ContextVar("current_redis_timeout", default=None)
+
+redis_breaker = CircuitBreaker("redis",
+                               failure_threshold=config.REDIS_BREAKER_FAILURES,
+                               reset_timeout=config.REDIS_BREAKER_RESET_TIMEOUT)
+
+
+# Lock release that only deletes the lock if we still own it (our token), so a
+# holder whose TTL ran out can't drop the next holder's lock.
+# KEYS: lock key; ARGV: owner token
+RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class CircuitOpenError(RedisConnectionError):
+    """Redis circuit is open — the command was not sent"""
+
+
+@contextmanager
+def redis_timeout(seconds: float):
+    """Tighter deadline for the Redis calls made inside the block"""
+    token = current_redis_timeout.set(seconds)
+    try:
+        yield
+    finally:
+        current_redis_timeout.reset(token)
+
+
+async def _guarded(command: str, call: Callable[[], Awaitable[Any]]) -> Any:
+    """Run one round trip to Redis under the deadline and the breaker, with metrics"""
+    timeout = current_redis_timeout.get() or config.REDIS_COMMAND_TIMEOUT
+    # Never outlive the request that issued it (see src/deadline.py). Checked
+    # before the breaker: a half-open probe slot must not be taken by a call
+    # that is never sent
+    request_remaining = deadline.remaining()
+    bounded_by_request = request_remaining is not None and request_remaining < timeout
+    if request_remaining is not None:
+        if request_remaining <= 0:
+            redis_command_errors.inc(command, "DeadlineExceeded")
+            raise RedisTimeoutError("Request deadline already passed")
+        timeout = min(timeout, request_remaining)
+
+    if not redis_breaker.allow():
+        redis_command_errors.inc(command, "CircuitOpen")
+        raise CircuitOpenError("Redis circuit breaker is open")
+
+    start_time = time.perf_counter()
+    try:
+        async with asyncio.timeout(timeout):
+            result = await call()
+    except TimeoutError as e:
+        if bounded_by_request:
+            # The request ran out of time, Redis did not misbehave
+            redis_breaker.record_cancelled()
+        else:
+            redis_breaker.record_failure()
+        redis_command_errors.inc(command, "Timeout")
+        raise RedisTimeoutError(f"Redis {command} timed out") from e
+    except (RedisConnectionError, RedisTimeoutError, OSError) as e:
+        redis_breaker.record_failure()
+        redis_command_errors.inc(command, type(e).__name__)
+        raise
+    except asyncio.CancelledError:
+        redis_breaker.record_cancelled()
+        raise
+    except Exception as e:
+        # e.g. a WRONGTYPE reply — Redis itself is answering fine
+        redis_breaker.record_success()
+        redis_command_errors.inc(command, type(e).__name__)
+        raise
+    finally:
+        redis_command_latency.observe(time.perf_counter() - start_time, command)
+
+    redis_breaker.record_success()
+    return result
+
+
+class InstrumentedPipeline(Pipeline):
+    """Pipeline whose execute() is one guarded round trip (metrics label PIPELINE)"""
+
+    async def execute(self, raise_on_error: bool = True):
+        return await _guarded("PIPELINE", lambda: super(InstrumentedPipeline, self).execute(raise_on_error))
+
+
+class InstrumentedRedis(Redis):
+    """Redis client that times every command, counts failures and goes through the breaker"""
+
+    async def execute_command(self, *args, **options):
+        return await _guarded(str(args[0]).upper(),
+                              lambda: super(InstrumentedRedis, self).execute_command(*args, **options))
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class RedisManager:
+    def __init__(self, url: str, max_connections: int, pool_timeout: float,
+                 socket_timeout: float, health_check_interval: int) -> None:
+        if not HIREDIS_AVAILABLE:
+            logging.warning("hiredis is not installed, falling back to the pure python Redis parser")
+
+        # BlockingConnectionPool waits (up to pool_timeout) for a free connection
+        # instead of opening a new one, so max_connections is a hard cap per worker.
+        self.pool = BlockingConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            timeout=pool_timeout,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout,
+            health_check_interval=health_check_interval,
+        )
+        self.client = InstrumentedRedis(connection_pool=self.pool)
+
+    async def health_check(self) -> bool:
+        try:
+            return await self.client.ping()
+        except Exception as e:
+            logging.exception(e)
+            return False
+
+    def pool_stats(self) -> dict:
+        return {
+            "max_connections": self.pool.max_connections,
+            "in_use": len(self.pool._in_use_connections),
+            "available": len(self.pool._available_connections),
+        }
+
+    async def close(self) -> None:
+        await self.client.aclose()
+        await self.pool.disconnect()
+
+
+redis_manager = RedisManager(
+    url=config.REDIS_URL,
+    max_connections=config.REDIS_MAX_CONNECTIONS,
+    pool_timeout=config.REDIS_POOL_TIMEOUT,
+    socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+    health_check_interval=config.REDIS_HEALTH_CHECK_INTERVAL,
+)
+
+token_block_list = redis_manager.client
+
+
+REVOKED_JTIS_KEY = "revoked_jtis"
+
+
+class LocalBlocklist:
+    """
+    Per-worker copy of recently revoked JTIs (jti -> expiry timestamp).
+    Filled by this worker's own logouts and synced from the `revoked_jtis`
+    sorted set (score = expiry) every REDIS_BLOCKLIST_SYNC_INTERVAL seconds.
+    """
+
+    def __init__(self) -> None:
+        self.jtis: Dict[str, float] = {}
+        self.synced_until = 0.0
+
+    def add(self, jti: str, expires_at: float) -> None:
+        self.jtis[jti] = expires_at
+
+    def contains(self, jti: str) -> bool:
+        expires_at = self.jtis.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at < time.time():
+            del self.jtis[jti]
+            return False
+        return True
+
+    async def sync(self) -> None:
+        now = time.time()
+        # Scores are expiry times, which grow with revocation time -> fetch only new ones
+        entries = await redis_manager.client.zrangebyscore(
+            REVOKED_JTIS_KEY, max(self.synced_until, now), "+inf", withscores=True)
+        for jti, expires_at in entries:
+            self.add(jti.decode(), expires_at)
+            self.synced_until = max(self.synced_until, expires_at)
+        self.jtis = {jti: expires_at for jti, expires_at in self.jtis.items() if expires_at >= now}
+
+    async def run_sync_loop(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except RedisError as e:
+                logging.warning("Revoked JTI sync failed: %s", e)
+            await asyncio.sleep(config.REDIS_BLOCKLIST_SYNC_INTERVAL)
+
+
+local_blocklist = LocalBlocklist()
 
 
 async def add_jti_to_blocklist(jti : str) -> None:
     """Store JTI in Redis for blacklist"""
+    expires_at = time.time() + JTI_EXPIRY
+    local_blocklist.add(jti, expires_at)
+
     await token_block_list.set(name=jti,
                                value="",
                                ex=JTI_EXPIRY)
-    
-    
+    # Replicated to every worker's local copy (see LocalBlocklist.sync)
+    await token_block_list.zadd(REVOKED_JTIS_KEY, {jti: expires_at})
+    await token_block_list.zremrangebyscore(REVOKED_JTIS_KEY, "-inf", time.time())
+
+
 async def token_in_blocklist(jti:str) -> bool:
-    """Check if the JTI exists in Redis"""
-    jti = await token_block_list.get(jti)
-    
-    return jti is not None
\ No newline at end of file
+    """Check if the JTI exists in Redis (or in the local copy while Redis is unavailable)"""
+    if local_blocklist.contains(jti):
+        return True
+
+    try:
+        with redis_timeout(config.REDIS_BLOCKLIST_TIMEOUT):
+            jti = await token_block_list.get(jti)
+    except RedisError as e:
+        if config.REDIS_BLOCKLIST_FAIL_OPEN:
+            # Local copy said "not revoked" — trust it
+            return False
+        logging.warning("Blocklist check failed, rejecting request: %s", e)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Token check is temporarily unavailable",
+                            headers={"Retry-After": str(int(config.REDIS_BREAKER_RESET_TIMEOUT))})
+
+    return jti is not None
+
+
+async def mark_recent_write(user_uid: str, window: int) -> None:
+    """Remember that this user just wrote, so their next reads use the primary"""
+    await redis_manager.client.set(name=f"ryw:{user_uid}",
+                                   value="",
+                                   ex=window)
+
+
+async def has_recent_write(user_uid: str) -> bool:
+    """Check if the user wrote within the read-your-writes window"""
+    marker = await redis_manager.client.get(f"ryw:{user_uid}")
+
+    return marker is not None
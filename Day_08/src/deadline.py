@@ -0,0 +1,97 @@
+"""
+End-to-end request deadlines.
+
+Every request gets a deadline: the route class default (REQUEST_TIMEOUT_READ /
+_WRITE / _BULK), shortened by an `X-Request-Timeout: <seconds>` header if the
+client will give up sooner. The deadline lives in a ContextVar and is used
+
+  - here, to cancel the whole request (504) once it passes,
+  - by the DB sessions, as `SET LOCAL statement_timeout` per transaction,
+  - by every Redis command, as the upper bound of its own timeout,
+
+so an abandoned request stops holding a pool connection instead of running
+its query to the end.
+"""
+
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+from starlette.responses import JSONResponse
+from src.admission import route_class
+from src.config import config
+from src.metrics import registry
+
+DEADLINE_HEADER = "x-request-timeout"
+
+# Absolute deadline (time.monotonic()) of the current request
+current_deadline: ContextVar[Optional[float]] = ContextVar("current_deadline", default=None)
+
+deadline_exceeded = registry.counter("deadline_exceeded")
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current request, None outside of a request"""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def request_timeout(method: str, path: str, header: Optional[str]) -> float:
+    timeout = {"bulk": config.REQUEST_TIMEOUT_BULK,
+               "write": config.REQUEST_TIMEOUT_WRITE}.get(route_class(method, path),
+                                                          config.REQUEST_TIMEOUT_READ)
+    if header:
+        try:
+            # The client can only shorten it
+            timeout = min(timeout, max(float(header), 0.0))
+        except ValueError:
+            pass
+    return timeout
+
+
+class DeadlineMiddleware:
+    """Plain ASGI middleware, so the timeout cancels the endpoint task itself"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        header = headers.get(DEADLINE_HEADER.encode())
+        timeout = request_timeout(scope["method"], scope["path"], header.decode() if header else None)
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        token = current_deadline.set(time.monotonic() + timeout)
+        timer = asyncio.timeout(timeout)
+        try:
+            async with timer:
+                await self.app(scope, receive, send_wrapper)
+        except TimeoutError:
+            if not timer.expired():
+                raise
+            # Route template, not the raw path: one series per endpoint, not per uid
+            route = scope.get("route")
+            deadline_exceeded.inc(scope["method"], route.path if route else "unmatched")
+            logging.warning("%s %s cancelled after its %.2fs deadline", scope["method"], scope["path"], timeout)
+            if response_started:
+                # Too late for a clean error response; the server will drop the connection
+                return
+            response = JSONResponse(content={"message": "Request deadline exceeded",
+                                             "error_code": "deadline_exceeded"},
+                                    status_code=504)
+            await response(scope, receive, send)
+        finally:
+            current_deadline.reset(token)
@@ -0,0 +1,149 @@
+"""
+Idempotency-Key support for write endpoints.
+
+The first response for (user, route, key) is stored in Redis for
+IDEMPOTENCY_TTL seconds and replayed byte for byte on retries. While the first
+execution is still running, duplicates wait for it — on the same worker through
+a shared future, across workers by polling Redis — instead of running it again.
+The Redis lock is only ever taken with SET NX, so if the first execution fails
+exactly one waiter runs it again.
+Reusing a key with a different request body is rejected with 422.
+"""
+
+import asyncio
+import hashlib
+import logging
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+from fastapi import Request, Response, status
+from fastapi.exceptions import HTTPException
+from redis.exceptions import RedisError
+from src.config import config
+from src.db.redis import redis_manager, RELEASE_LOCK
+from src.metrics import registry
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+idempotency_requests = registry.counter("idempotency_requests")
+
+# Executions in flight on this worker, keyed like the Redis entry
+_in_flight: Dict[str, asyncio.Future] = {}
+
+
+def request_fingerprint(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def _replay(stored: dict) -> Response:
+    return Response(content=stored[b"body"],
+                    status_code=int(stored[b"status"]),
+                    media_type=stored[b"content_type"].decode(),
+                    headers={"Idempotent-Replayed": "true"})
+
+
+def _check_fingerprint(stored: dict, fingerprint: str) -> None:
+    if stored[b"fingerprint"].decode() != fingerprint:
+        raise HTTPException(status_code=422,
+                            detail="Idempotency-Key was already used with a different request")
+
+
+async def _wait_for_response(response_key: str, lock_key: str) -> Optional[dict]:
+    """Poll until the other worker stores its response (or gives up / crashes)"""
+    redis = redis_manager.client
+    deadline = asyncio.get_running_loop().time() + config.IDEMPOTENCY_WAIT
+    while asyncio.get_running_loop().time() < deadline:
+        stored = await redis.hgetall(response_key)
+        if stored:
+            return stored
+        if not await redis.exists(lock_key):
+            return None
+        await asyncio.sleep(0.05)
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                        detail="A request with this Idempotency-Key is still in progress",
+                        headers={"Retry-After": "1"})
+
+
+async def idempotent(request: Request, user_uid: str, fingerprint: str,
+                     handler: Callable[[], Awaitable[Response]]) -> Response:
+    """
+    Run `handler` at most once per Idempotency-Key. Without the header it just runs.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key:
+        return await handler()
+
+    base_key = f"idempotency:{user_uid}:{request.method}:{request.url.path}:{key}"
+    token = uuid.uuid4().hex
+    response_key, lock_key = f"{base_key}:response", f"{base_key}:lock"
+    redis = redis_manager.client
+
+    # Same worker duplicate: share the running execution
+    running = _in_flight.get(base_key)
+    if running is not None:
+        idempotency_requests.inc("waited_local")
+        try:
+            stored = await asyncio.shield(running)
+        except asyncio.CancelledError:
+            if not running.cancelled():
+                raise
+            # The first request was dropped mid-way — let the client retry
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail="The original request was interrupted, please retry",
+                                headers={"Retry-After": "1"})
+        _check_fingerprint(stored, fingerprint)
+        return _replay(stored)
+
+    try:
+        stored = await redis.hgetall(response_key)
+        while not stored and not await redis.set(lock_key, token, nx=True, ex=config.IDEMPOTENCY_LOCK_TTL):
+            # Another worker is executing it
+            idempotency_requests.inc("waited_remote")
+            stored = await _wait_for_response(response_key, lock_key)
+            # None: it failed there (nothing stored) — try to take the lock again;
+            # if another waiter got it first, wait for that one instead
+    except RedisError as e:
+        # Without Redis we can't dedupe; running the write beats failing it
+        logging.exception(e)
+        idempotency_requests.inc("redis_unavailable")
+        return await handler()
+
+    if stored:
+        idempotency_requests.inc("replayed")
+        _check_fingerprint(stored, fingerprint)
+        return _replay(stored)
+
+    idempotency_requests.inc("executed")
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[base_key] = future
+    try:
+        response = await handler()
+        stored = {b"status": str(response.status_code).encode(),
+                  b"content_type": (response.media_type or "application/json").encode(),
+                  b"body": response.body,
+                  b"fingerprint": fingerprint.encode()}
+        # Only successful / client-error outcomes are final; 5xx may be retried for real
+        if response.status_code < 500:
+            try:
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.hset(response_key, mapping=stored)
+                    pipe.expire(response_key, config.IDEMPOTENCY_TTL)
+                    await pipe.execute()
+            except RedisError as e:
+                logging.exception(e)
+        future.set_result(stored)
+        return response
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Nobody may be waiting on it — don't let asyncio warn about it
+        future.exception()
+        raise
+    finally:
+        _in_flight.pop(base_key, None)
+        try:
+            # Only our own lock: it may have expired and been taken by another worker
+            await redis.register_script(RELEASE_LOCK)(keys=[lock_key], args=[token])
+        except RedisError as e:
+            logging.exception(e)
@@ -0,0 +1,91 @@
+"""
+Small in-process metrics registry (counters, gauges + latency histograms).
+Every worker keeps its own numbers; GET /metrics returns a JSON snapshot
+so we can watch Redis / DB usage per worker without extra infrastructure.
+"""
+
+import bisect
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from fastapi import APIRouter
+
+# Latency buckets in seconds (upper bounds), last bucket catches everything else
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.values: Dict[Tuple[str, ...], int] = defaultdict(int)
+
+    def inc(self, *labels: str, amount: int = 1) -> None:
+        self.values[labels] += amount
+
+    def snapshot(self) -> dict:
+        return {"/".join(k): v for k, v in self.values.items()}
+
+
+class Gauge:
+    def __init__(self) -> None:
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+    def snapshot(self) -> dict:
+        return {"/".join(k): v for k, v in self.values.items()}
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts: Dict[Tuple[str, ...], list] = {}
+        self.sums: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def observe(self, value: float, *labels: str) -> None:
+        if labels not in self.counts:
+            self.counts[labels] = [0] * (len(self.buckets) + 1)
+        self.counts[labels][bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def snapshot(self) -> dict:
+        data = {}
+        for labels, counts in self.counts.items():
+            data["/".join(labels)] = {
+                "count": sum(counts),
+                "sum": self.sums[labels],
+                "buckets": dict(zip([*map(str, self.buckets), "+Inf"], counts)),
+            }
+        return data
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, object] = {}
+
+    def counter(self, name: str) -> Counter:
+        return self.metrics.setdefault(name, Counter())
+
+    def gauge(self, name: str) -> Gauge:
+        return self.metrics.setdefault(name, Gauge())
+
+    def histogram(self, name: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(buckets))
+
+    def snapshot(self) -> dict:
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+
+# Single registry shared by the whole app (one per worker process)
+registry = MetricsRegistry()
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics")
+async def get_metrics():
+    """
+    GET /metrics
+    Return a snapshot of every counter/histogram of this worker
+    """
+    return registry.snapshot()
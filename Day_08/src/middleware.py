@@ -1,17 +1,101 @@
 import time
 from fastapi import FastAPI, status
 from fastapi.requests import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 import logging
+from src.db.profiler import QueryStats, current_query_stats
+from src.metrics import registry
+from src.compression import choose_encoding, is_compressible, compress
+from src.config import config
+from src.admission import Admission, Rejected, limiters, route_class
+from src.deadline import DeadlineMiddleware
 
 logger = logging.getLogger('uvicorn.access')
 logger.disabled = True
 
 
+db_queries_per_request = registry.histogram("db_queries_per_request",
+                                            buckets=(1, 2, 3, 5, 10, 20, 50, 100))
+db_time_per_request = registry.histogram("db_seconds_per_request")
+
+
 def register_middleware(app: FastAPI):
     
     
+    @app.middleware('http')
+    async def compression(request: Request, call_next):
+        response = await call_next(request)
+
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        if (encoding is None or request.method == "HEAD"
+                or response.status_code in (204, 304)
+                or "content-encoding" in response.headers
+                or not is_compressible(response.headers.get("content-type", ""))):
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        compressed = len(body) >= config.COMPRESSION_MIN_SIZE
+        if compressed:
+            body = await compress(body, encoding)
+
+        new_response = Response(content=body, status_code=response.status_code, background=response.background)
+        # Keep every original header, repeated ones (Set-Cookie) included
+        new_response.raw_headers = [(k, v) for k, v in response.raw_headers if k != b"content-length"]
+        headers = new_response.headers
+        headers["content-length"] = str(len(body))
+        vary = ", ".join(headers.getlist("vary"))
+        if not vary:
+            headers["vary"] = "Accept-Encoding"
+        elif vary != "*" and "accept-encoding" not in [v.strip().lower() for v in vary.split(",")]:
+            headers["vary"] = f"{vary}, Accept-Encoding"
+        if compressed:
+            headers["content-encoding"] = encoding
+        return new_response
+    
+    
+    @app.middleware('http')
+    async def sql_profiler(request: Request, call_next):
+        # Engine hooks in src/db/profiler.py add to this object during the request
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            current_query_stats.reset(token)
+
+        route = request.scope.get("route")
+        route_name = f"{request.method} {route.path if route else request.url.path}"
+        db_queries_per_request.observe(stats.count, route_name)
+        db_time_per_request.observe(stats.duration, route_name)
+
+        response.headers["Server-Timing"] = stats.server_timing()
+        return response
+    
+    
+    @app.middleware('http')
+    async def admission_control(request: Request, call_next):
+        # Shed load early (503 + Retry-After) instead of queueing on the DB pool
+        name = route_class(request.method, request.url.path)
+        if not config.ADMISSION_CONTROL_ENABLED or name is None:
+            return await call_next(request)
+
+        try:
+            async with Admission(limiters[name]) as admission:
+                response = await call_next(request)
+                admission.failed = response.status_code >= 500
+        except Rejected as e:
+            return JSONResponse(content={"message": "Server is busy, please retry later",
+                                         "error_code": "server_overloaded"},
+                                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                headers={"Retry-After": str(e.retry_after)})
+        return response
+    
+    
+    # Outside admission control, so time spent queued counts against the deadline
+    app.add_middleware(DeadlineMiddleware)
+    
+    
     @app.middleware('http')
     async def custom_middleware(request: Request, call_next):
         start_time = time.time()
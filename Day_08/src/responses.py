@@ -0,0 +1,71 @@
+"""
+Bookly response layer.
+
+- dumps_json: orjson with a `default` hook for the asyncpg UUID subclass,
+  used by every endpoint that encodes database rows itself.
+- BooklyJSONResponse: the app's default response class, renders with orjson.
+- serializers: Pydantic TypeAdapters for every response schema, built once at
+  startup. `serialize_response(schema, obj)` validates ORM objects straight
+  from their attributes and dumps JSON bytes in one pydantic-core pass,
+  instead of FastAPI's response_model validation + jsonable_encoder + json.dumps.
+"""
+
+import uuid
+from typing import Any, Dict, List
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+from src.books.schema import Book, BookDetailModel, BookBatchModel
+from src.auth.schemas import UserBooksModel
+from src.reviews.schema import ReviweModel
+
+def json_default(obj: Any) -> str:
+    # asyncpg returns UUID columns as asyncpg.pgproto.pgproto.UUID, a uuid.UUID
+    # subclass that orjson only serializes natively for the exact type
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps_json(content: Any) -> bytes:
+    return orjson.dumps(content, default=json_default)
+
+
+# Every schema a Bookly route responds with
+RESPONSE_SCHEMAS = [Book, List[Book], BookDetailModel, BookBatchModel, UserBooksModel, ReviweModel]
+
+
+class BooklyJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+class ResponseSerializers:
+    def __init__(self) -> None:
+        self.adapters: Dict[Any, TypeAdapter] = {}
+
+    def adapter(self, schema) -> TypeAdapter:
+        # Building a TypeAdapter compiles the schema's validator/serializer — do it once
+        adapter = self.adapters.get(schema)
+        if adapter is None:
+            adapter = self.adapters[schema] = TypeAdapter(schema)
+        return adapter
+
+    def build(self) -> None:
+        for schema in RESPONSE_SCHEMAS:
+            self.adapter(schema)
+
+    def dump_json(self, schema, obj: Any) -> bytes:
+        adapter = self.adapter(schema)
+        return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+
+
+serializers = ResponseSerializers()
+
+
+def serialize_response(schema, obj: Any, status_code: int = 200) -> Response:
+    return Response(content=serializers.dump_json(schema, obj),
+                    status_code=status_code,
+                    media_type="application/json")
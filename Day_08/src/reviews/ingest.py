@@ -0,0 +1,215 @@
+"""
+Asynchronous review ingestion through a Redis stream.
+
+With REVIEW_INGESTION_MODE=stream, POST /api/v1/reviews/book/{book_uid} only
+validates the review, XADDs it to REVIEW_STREAM and answers 202 with the
+stream message id — no database connection is taken. There is no review uid
+to return yet: a user's review of a book is one row keyed by (user_uid,
+book_uid), and re-reviewing keeps the existing row's uid. If Redis is
+unavailable the route falls back to the synchronous write. `ReviewStreamWorker` (run with
+`python -m src.reviews.ingest_worker`) reads the stream in a consumer group
+and writes each batch with a single INSERT ... SELECT FROM unnest(...)
+ON CONFLICT DO UPDATE.
+
+Delivery is at-least-once: entries are XACKed only after their batch is
+committed, and entries left pending by a crashed worker are reclaimed with
+XAUTOCLAIM. Replaying an entry is harmless — the write is an upsert on
+(user_uid, book_uid), the same one the synchronous path does.
+
+An entry the database rejects (e.g. a NUL byte in review_text) only fails its
+own write: a failed batch is split in halves until the bad entry is alone, the
+rest is committed, and after REVIEW_STREAM_MAX_DELIVERIES deliveries the entry
+is moved to REVIEW_STREAM_DEAD_LETTER and acknowledged.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Dict, List, Tuple
+from redis.exceptions import ResponseError
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from src.config import config
+from src.db.ids import uuid7
+from src.db.main import SessionLocal
+from src.db.redis import redis_manager, redis_timeout
+from src.books.leaderboard import leaderboard
+from src.metrics import registry
+from .schema import ReviewCreateModel
+
+review_stream_entries = registry.counter("review_stream_entries")
+review_stream_batch_seconds = registry.histogram("review_stream_batch_seconds")
+
+# Entries whose book or user doesn't exist are dropped by the JOINs
+BULK_UPSERT = text("""
+    INSERT INTO reviews (uid, rating, review_text, user_uid, book_uid)
+    SELECT v.uid, v.rating, v.review_text, v.user_uid, v.book_uid
+    FROM unnest(CAST(:uids AS uuid[]), CAST(:ratings AS integer[]), CAST(:review_texts AS varchar[]),
+                CAST(:user_uids AS uuid[]), CAST(:book_uids AS uuid[]))
+         AS v(uid, rating, review_text, user_uid, book_uid)
+    JOIN books ON books.uid = v.book_uid
+    JOIN users ON users.uid = v.user_uid
+    ON CONFLICT ON CONSTRAINT uq_reviews_user_uid_book_uid DO UPDATE
+    SET rating = excluded.rating, review_text = excluded.review_text, updated_at = now()
+    RETURNING reviews.book_uid, reviews.rating,
+              (SELECT previous.rating FROM reviews AS previous
+               WHERE previous.user_uid = reviews.user_uid AND previous.book_uid = reviews.book_uid) AS old_rating
+""")
+
+
+async def enqueue_review(user_uid: str, book_uid: uuid.UUID, review_data: ReviewCreateModel,
+                         stream: str = config.REVIEW_STREAM) -> str:
+    """Append a validated review to the stream and return its message id"""
+    message_id = await redis_manager.client.xadd(stream, {
+        "user_uid": str(user_uid),
+        "book_uid": str(book_uid),
+        "rating": review_data.rating,
+        "review_text": review_data.review_text,
+    }, maxlen=config.REVIEW_STREAM_MAXLEN, approximate=True)
+    review_stream_entries.inc("enqueued")
+    return message_id.decode()
+
+
+def _parse(fields: Dict[bytes, bytes]) -> Tuple[uuid.UUID, int, str, uuid.UUID, uuid.UUID]:
+    # The uid is only used if this creates the row; an update keeps the existing one
+    return (uuid7(),
+            int(fields[b"rating"]),
+            fields[b"review_text"].decode(),
+            uuid.UUID(fields[b"user_uid"].decode()),
+            uuid.UUID(fields[b"book_uid"].decode()))
+
+
+class ReviewStreamWorker:
+    def __init__(self, consumer: str, stream: str = config.REVIEW_STREAM,
+                 group: str = config.REVIEW_STREAM_GROUP,
+                 batch_size: int = config.REVIEW_STREAM_BATCH_SIZE) -> None:
+        self.consumer = consumer
+        self.stream = stream
+        self.group = group
+        self.batch_size = batch_size
+        self.claim_cursor = "0-0"
+        self.stopping = False
+
+    async def ensure_group(self) -> None:
+        try:
+            await redis_manager.client.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def claim_stale(self) -> List[Tuple[bytes, dict]]:
+        """Entries another (crashed) consumer read but never acknowledged"""
+        self.claim_cursor, entries, *_ = await redis_manager.client.xautoclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=config.REVIEW_STREAM_CLAIM_IDLE_MS,
+            start_id=self.claim_cursor, count=self.batch_size)
+        return entries
+
+    async def read_new(self) -> List[Tuple[bytes, dict]]:
+        block_ms = config.REVIEW_STREAM_BLOCK_MS
+        # XREADGROUP BLOCK outlives the default per-command deadline
+        with redis_timeout(block_ms / 1000 + config.REDIS_COMMAND_TIMEOUT):
+            response = await redis_manager.client.xreadgroup(
+                self.group, self.consumer, {self.stream: ">"},
+                count=self.batch_size, block=block_ms)
+        return response[0][1] if response else []
+
+    async def write_batch(self, entries: List[Tuple[bytes, dict]]) -> int:
+        # Later entries of the same (user, book) win — and one statement can't
+        # upsert the same row twice
+        reviews = {}
+        for entry_id, fields in entries:
+            try:
+                review = _parse(fields)
+            except (KeyError, ValueError, TypeError, AttributeError) as e:
+                logging.warning("Dropping malformed review entry %s: %s", entry_id, e)
+                review_stream_entries.inc("malformed")
+                continue
+            reviews[(review[3], review[4])] = review
+
+        if not reviews:
+            return 0
+        uids, ratings, review_texts, user_uids, book_uids = map(list, zip(*reviews.values()))
+        async with SessionLocal() as session:
+            result = await session.execute(BULK_UPSERT, {
+                "uids": uids, "ratings": ratings, "review_texts": review_texts,
+                "user_uids": user_uids, "book_uids": book_uids,
+            })
+            written = result.all()
+            await session.commit()
+        await leaderboard.record_reviews(written)
+        dropped = len(reviews) - len(written)
+        if dropped:
+            review_stream_entries.inc("dropped", amount=dropped)
+        review_stream_entries.inc("written", amount=len(written))
+        return len(written)
+
+    async def delivery_count(self, entry_id: bytes) -> int:
+        pending = await redis_manager.client.xpending_range(self.stream, self.group,
+                                                            min=entry_id, max=entry_id, count=1)
+        return pending[0]["times_delivered"] if pending else 0
+
+    async def dead_letter(self, entry_id: bytes, fields: dict, error: Exception) -> None:
+        async with redis_manager.client.pipeline(transaction=True) as pipe:
+            pipe.xadd(config.REVIEW_STREAM_DEAD_LETTER,
+                      {**fields, b"entry_id": entry_id, b"error": str(error)[:1000]},
+                      maxlen=config.REVIEW_STREAM_MAXLEN, approximate=True)
+            pipe.xack(self.stream, self.group, entry_id)
+            await pipe.execute()
+        review_stream_entries.inc("dead_lettered")
+
+    async def reject(self, entry: Tuple[bytes, dict], error: Exception) -> None:
+        """A single entry the database refused: retried until REVIEW_STREAM_MAX_DELIVERIES, then dead-lettered"""
+        entry_id, fields = entry
+        deliveries = await self.delivery_count(entry_id)
+        if deliveries < config.REVIEW_STREAM_MAX_DELIVERIES:
+            # Left pending; XAUTOCLAIM hands it out again
+            logging.warning("Review entry %s rejected (delivery %s): %s", entry_id, deliveries, error)
+            return
+        logging.error("Moving review entry %s to %s after %s deliveries: %s",
+                      entry_id, config.REVIEW_STREAM_DEAD_LETTER, deliveries, error)
+        await self.dead_letter(entry_id, fields, error)
+
+    async def commit(self, entries: List[Tuple[bytes, dict]]) -> None:
+        """
+        Write and XACK the entries. If the database rejects the batch, split it
+        in halves until the bad entries are alone, so one of them can't hold back
+        the rest of the batch.
+        """
+        try:
+            await self.write_batch(entries)
+        except DBAPIError as e:
+            if e.connection_invalidated or isinstance(e, (OperationalError, InterfaceError)):
+                # The database is unavailable, no entry is to blame: everything stays pending
+                raise
+            if len(entries) == 1:
+                await self.reject(entries[0], e)
+                return
+            middle = len(entries) // 2
+            await self.commit(entries[:middle])
+            await self.commit(entries[middle:])
+            return
+        # Only now: a crash before this line means redelivery, not loss
+        await redis_manager.client.xack(self.stream, self.group, *(entry_id for entry_id, _ in entries))
+
+    async def process(self, entries: List[Tuple[bytes, dict]]) -> None:
+        start_time = time.perf_counter()
+        await self.commit(entries)
+        review_stream_batch_seconds.observe(time.perf_counter() - start_time)
+
+    async def run_once(self) -> int:
+        entries = await self.claim_stale() or await self.read_new()
+        if entries:
+            await self.process(entries)
+        return len(entries)
+
+    async def run(self) -> None:
+        await self.ensure_group()
+        while not self.stopping:
+            try:
+                await self.run_once()
+            except Exception as e:
+                # Unacked entries stay pending and are reclaimed later
+                logging.exception(e)
+                await asyncio.sleep(1)
@@ -0,0 +1,32 @@
+"""
+Consumer for the review ingestion stream (REVIEW_INGESTION_MODE=stream).
+Run as many as needed; each one needs a unique consumer name.
+
+    python -m src.reviews.ingest_worker
+    python -m src.reviews.ingest_worker --consumer worker-2 --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+from src.config import config
+from src.db.redis import redis_manager
+from src.reviews.ingest import ReviewStreamWorker
+
+
+async def main(args) -> None:
+    worker = ReviewStreamWorker(consumer=args.consumer, batch_size=args.batch_size)
+    print(f"Consuming {worker.stream} as {worker.group}/{worker.consumer}")
+    try:
+        await worker.run()
+    finally:
+        await redis_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write reviews queued in the Redis stream")
+    parser.add_argument("--consumer", default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument("--batch-size", type=int, default=config.REVIEW_STREAM_BATCH_SIZE)
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,74 @@
+"""
+Read-only keyset pagination of a book's reviews.
+
+Pages are addressed by an opaque cursor holding the sort key of the last row
+returned, so page N is `WHERE book_uid = :uid AND (key) < (:cursor) ORDER BY
+key DESC LIMIT n` — an index range scan on (book_uid, key...) that costs the
+same for the first page and the thousandth, unlike OFFSET.
+
+Sorts:
+  newest  -> (created_at, uid)          index ix_reviews_book_uid_created_at
+  rating  -> (rating, created_at, uid)  index ix_reviews_book_uid_rating
+"""
+
+import base64
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+import orjson
+from fastapi import HTTPException, status
+from sqlalchemy import select, tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.model import Review
+from src.responses import dumps_json
+from .schema import ReviweModel
+
+reviews_table = Review.__table__
+
+REVIEW_KEYS = tuple(ReviweModel.model_fields)
+REVIEW_COLUMNS = [reviews_table.c[name] for name in REVIEW_KEYS]
+
+SORT_KEYS = {
+    "newest": ("created_at", "uid"),
+    "rating": ("rating", "created_at", "uid"),
+}
+
+
+def encode_cursor(sort: str, row: dict) -> str:
+    values = [row[name] for name in SORT_KEYS[sort]]
+    return base64.urlsafe_b64encode(dumps_json([sort, *values])).decode()
+
+
+def decode_cursor(sort: str, cursor: str) -> Tuple:
+    try:
+        cursor_sort, *values = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_sort != sort or len(values) != len(SORT_KEYS[sort]):
+            raise ValueError(cursor_sort)
+        parsed = []
+        for name, value in zip(SORT_KEYS[sort], values):
+            if name == "created_at":
+                value = datetime.fromisoformat(value)
+            elif name == "uid":
+                value = uuid.UUID(value)
+            else:
+                value = int(value)
+            parsed.append(value)
+        return tuple(parsed)
+    except (ValueError, TypeError, orjson.JSONDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+class ReviewReadRepository:
+    async def get_book_reviews_page_json(self, book_uid: uuid.UUID, sort: str, limit: int,
+                                         cursor: Optional[str], session: AsyncSession) -> bytes:
+        key_columns = [reviews_table.c[name] for name in SORT_KEYS[sort]]
+        statement = select(*REVIEW_COLUMNS).where(reviews_table.c.book_uid == book_uid)
+        if cursor:
+            statement = statement.where(tuple_(*key_columns) < tuple_(*decode_cursor(sort, cursor)))
+        # One extra row tells us whether there is a next page
+        statement = statement.order_by(*(column.desc() for column in key_columns)).limit(limit + 1)
+
+        result = await session.execute(statement)
+        rows = [dict(zip(REVIEW_KEYS, row)) for row in result.all()]
+        next_cursor = encode_cursor(sort, rows[limit - 1]) if len(rows) > limit else None
+        return dumps_json({"reviews": rows[:limit], "next_cursor": next_cursor})
@@ -1,24 +1,75 @@
-from fastapi import APIRouter, Depends
+import logging
+import uuid
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Request, Response, Query, status
+from redis.exceptions import RedisError
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from .schema import ReviewCreateModel
+from .schema import ReviewCreateModel, ReviweModel, ReviewPageModel
 from .service import ReviewService
+from .repository import ReviewReadRepository
+from .ingest import enqueue_review, review_stream_entries
 
-from src.db.model import User
-from src.auth.dependencies import get_current_user
-from src.db.main import get_session
+from src.auth.dependencies import AccessTokenBearer, RoleChecker
+from src.db.main import get_session, get_read_session
+from src.config import config
+from src.responses import serialize_response, BooklyJSONResponse
+from src.idempotency import idempotent, request_fingerprint
 
 review_service = ReviewService()
+review_read_repository = ReviewReadRepository()
+role_checker = Depends(RoleChecker(['admin', 'user']))
+access_token_bearer = AccessTokenBearer()
 
 review_router = APIRouter()
 
-@review_router.post("/book/{book_uid}")
-async def review_to_books(book_uid: str, review_data: ReviewCreateModel,
-                          session: AsyncSession = Depends(get_session), current_user: User = Depends(get_current_user)):
+@review_router.get("/book/{book_uid}", response_model=ReviewPageModel, dependencies=[role_checker])
+async def get_book_reviews(book_uid: uuid.UUID,
+                           sort: Literal["newest", "rating"] = "newest",
+                           limit: int = Query(20, ge=1, le=100),
+                           cursor: Optional[str] = None,
+                           session: AsyncSession = Depends(get_read_session)):
+    """
+    GET /api/v1/reviews/book/{book_uid}?sort=newest|rating&limit=20&cursor=...
+    One page of a book's reviews; pass `next_cursor` back as `cursor` for the next page.
+    (keyset pagination — constant time per page, however many reviews the book has)
+    """
+    page_json = await review_read_repository.get_book_reviews_page_json(book_uid, sort, limit, cursor, session)
+    return Response(content=page_json, media_type="application/json")
+
+
+@review_router.post("/book/{book_uid}", response_model=ReviweModel)
+async def review_to_books(book_uid: uuid.UUID, review_data: ReviewCreateModel, request: Request,
+                          session: AsyncSession = Depends(get_session),
+                          token_details: dict = Depends(access_token_bearer)):
+    """
+    POST /api/v1/reviews/book/{book_uid}
+    Send an Idempotency-Key header to make retries safe (the first response is replayed).
+    The reviewer is taken from the token claims — no user or book lookup before the insert.
+    With REVIEW_INGESTION_MODE=stream the review is queued instead and 202 is returned
+    with the stream message id; the review is then found by (user_uid, book_uid)
+    (see src/reviews/ingest.py). If Redis is unavailable it is written synchronously.
+    """
+    user_uid = token_details.get('user')['user_uid']
     
-    new_review = await review_service.add_reviews_to_book(user_email = current_user.email,
-                                                    review_data = review_data,
-                                                    book_uid = book_uid,
-                                                    session=session)
+    async def add_review() -> Response:
+        if config.REVIEW_INGESTION_MODE == "stream":
+            try:
+                message_id = await enqueue_review(user_uid, book_uid, review_data)
+                return BooklyJSONResponse(content={"message_id": message_id, "status": "queued",
+                                                   "user_uid": user_uid, "book_uid": str(book_uid)},
+                                          status_code=status.HTTP_202_ACCEPTED)
+            except RedisError as e:
+                # Slower, but the review isn't lost
+                logging.warning("Review stream unavailable, writing synchronously: %s", e)
+                review_stream_entries.inc("sync_fallback")
+
+        new_review = await review_service.add_reviews_to_book(user_uid = uuid.UUID(user_uid),
+                                                        review_data = review_data,
+                                                        book_uid = book_uid,
+                                                        session=session)
+        
+        return serialize_response(ReviweModel, new_review)
     
-    return new_review
\ No newline at end of file
+    return await idempotent(request, user_uid,
+                            request_fingerprint(str(book_uid), review_data.model_dump_json()), add_review)
@@ -1,5 +1,5 @@
 import uuid
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -12,7 +12,12 @@ class ReviweModel(BaseModel):
     book_uid: Optional[uuid.UUID]
     created_at: datetime
     updated_at: Optional[datetime] = None
- 
+
+
+class ReviewPageModel(BaseModel):
+    reviews: List[ReviweModel]
+    next_cursor: Optional[str] = None
+
 class ReviewCreateModel(BaseModel):
     rating: int = Field(lt=5)
     review_text: str
\ No newline at end of file
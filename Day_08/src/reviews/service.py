@@ -1,42 +1,58 @@
 import logging
+import uuid
 from fastapi import status
 from fastapi.exceptions import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from src.db.model import Review
-from src.auth.service import UserService
-from src.books.service import BookService
+from src.books.leaderboard import leaderboard
 from .schema import ReviewCreateModel, ReviweModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-book_service = BookService()
-user_service = UserService()
+reviews_table = Review.__table__
+REVIEW_COLUMNS = [reviews_table.c[name] for name in ReviweModel.model_fields]
+previous_reviews = reviews_table.alias("previous")
+
+# Subqueries in RETURNING see the table as it was before the statement, so this
+# is the rating being replaced (NULL when the review is new) — for the leaderboards
+OLD_RATING = (select(previous_reviews.c.rating)
+              .where(previous_reviews.c.user_uid == reviews_table.c.user_uid,
+                     previous_reviews.c.book_uid == reviews_table.c.book_uid)
+              .scalar_subquery()
+              .label("old_rating"))
+
 
 class ReviewService:
-    async def add_reviews_to_book(self, user_email: str, book_uid: str, 
+    async def add_reviews_to_book(self, user_uid: uuid.UUID, book_uid: uuid.UUID,
                                   review_data: ReviewCreateModel, session: AsyncSession):
+        """
+        Create the user's review of the book, or edit it if they already wrote one
+        (unique (user_uid, book_uid)) — one INSERT ... ON CONFLICT DO UPDATE RETURNING.
+        Neither the book (with all its selectin-loaded reviews) nor the user is loaded:
+        user_uid comes from the token and the foreign keys reject unknown books / users.
+        """
+        review_dict = review_data.model_dump()
+        statement = insert(Review).values(**review_dict, user_uid=user_uid, book_uid=book_uid)
+        statement = statement.on_conflict_do_update(
+            constraint="uq_reviews_user_uid_book_uid",
+            set_={**{name: statement.excluded[name] for name in review_dict}, "updated_at": func.now()},
+        ).returning(*REVIEW_COLUMNS, OLD_RATING)
+
         try:
-            book = await book_service.get_book(book_uid=book_uid, session=session)
-            
-            user = await user_service.get_user_by_email(email=user_email, session=session)
-            
-            review_data_dict = review_data.model_dump()
-            new_review = Review(**review_data_dict)
-            
-            if not book:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book Not Found")
-            
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User Not Found")
-            
-            new_review.user = user
-            new_review.book = book
-            
-            session.add(new_review)
-            
+            result = await session.execute(statement)
+            review = result.one()
+            # Core statement, no flush -> flag it for read-your-writes (src/db/main.py)
+            session.info["has_writes"] = True
             await session.commit()
-            
-            return new_review
-            
+        except IntegrityError as e:
+            await session.rollback()
+            missing = "User" if "user_uid" in str(e.orig) else "Book"
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{missing} Not Found")
         except Exception as e:
             logging.exception(e)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Ooops... Something went wrong!")
\ No newline at end of file
+                                detail="Ooops... Something went wrong!")
+
+        await leaderboard.record_reviews([(review.book_uid, review.rating, review.old_rating)])
+        return review
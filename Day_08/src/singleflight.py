@@ -0,0 +1,87 @@
+"""
+Single-flight request coalescing.
+
+Concurrent identical reads (same key) share one in-flight call and its result
+instead of each running the same query. The call runs in its own task, so a
+caller that disconnects does not cancel it for everyone else — which also
+means `fn` must not use the caller's request-scoped session. The task gets a
+fresh context: the leader's request deadline (src/deadline.py) must not become
+the statement_timeout of every follower.
+
+With SINGLEFLIGHT_REDIS_LOCK_MS > 0 the leader of each worker also takes a
+short Redis lock: one worker runs the call and publishes the bytes for a
+moment, the others wait for them instead of hitting the database. The lock
+holds a random token and is only released by its owner (compare-and-delete),
+so a leader whose lock expired mid-call can't release another worker's lock.
+"""
+
+import asyncio
+import contextvars
+import logging
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+from redis.exceptions import RedisError
+from src.config import config
+from src.db.redis import redis_manager, RELEASE_LOCK
+from src.metrics import registry
+
+singleflight_calls = registry.counter("singleflight_calls")
+
+# Redis can't store None — cache "not found" as this marker
+_NONE = b"\x00singleflight:none"
+
+
+class SingleFlight:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[bytes]:
+        task = self.calls.get(key)
+        if task is None:
+            singleflight_calls.inc(self.name, "leader")
+            # Empty context: no request deadline, no per-request query stats
+            task = asyncio.get_running_loop().create_task(self._run(key, fn), context=contextvars.Context())
+            self.calls[key] = task
+            task.add_done_callback(lambda _: self.calls.pop(key, None))
+        else:
+            singleflight_calls.inc(self.name, "shared")
+
+        # shield: cancelling one waiter must not cancel the shared call
+        return await asyncio.shield(task)
+
+    async def _run(self, key: str, fn) -> Optional[bytes]:
+        if config.SINGLEFLIGHT_REDIS_LOCK_MS <= 0:
+            return await fn()
+        try:
+            return await self._run_with_redis_lock(key, fn)
+        except RedisError as e:
+            # Redis trouble must never fail the read itself
+            logging.exception(e)
+            return await fn()
+
+    async def _run_with_redis_lock(self, key: str, fn) -> Optional[bytes]:
+        redis = redis_manager.client
+        lock_key = f"singleflight:{self.name}:{key}:lock"
+        result_key = f"singleflight:{self.name}:{key}:result"
+        lock_ms = config.SINGLEFLIGHT_REDIS_LOCK_MS
+
+        token = uuid.uuid4().hex
+        if await redis.set(lock_key, token, nx=True, px=lock_ms):
+            try:
+                result = await fn()
+                await redis.set(result_key, _NONE if result is None else result, px=lock_ms)
+                return result
+            finally:
+                await redis.register_script(RELEASE_LOCK)(keys=[lock_key], args=[token])
+
+        # Another worker is running it — wait (at most one lock period) for its result
+        singleflight_calls.inc(self.name, "shared_redis")
+        deadline = asyncio.get_running_loop().time() + lock_ms / 1000
+        while asyncio.get_running_loop().time() < deadline:
+            cached = await redis.get(result_key)
+            if cached is not None:
+                return None if cached == _NONE else cached
+            await asyncio.sleep(0.01)
+
+        return await fn()
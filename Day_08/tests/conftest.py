@@ -0,0 +1,22 @@
+"""
+Shared test setup. Run from Day_08 with `python -m pytest -q tests`.
+
+Settings are required at import time (src/config.py), so placeholders are set
+before anything from `src` is imported; real values in the environment win.
+"""
+
+import os
+
+for name, value in {
+    "DATABASE_URL": "sqlite+aiosqlite://",
+    "JWT_SECRET": "test-secret",
+    "JWT_ALGORITHM": "HS256",
+    "MAIL_USERNAME": "bookly",
+    "MAIL_PASSWORD": "bookly",
+    "MAIL_FROM": "bookly@example.com",
+    "MAIL_PORT": "587",
+    "MAIL_SERVER": "localhost",
+    "MAIL_FROM_NAME": "Bookly",
+    "DOMAIN": "localhost",
+}.items():
+    os.environ.setdefault(name, value)
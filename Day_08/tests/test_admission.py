@@ -0,0 +1,116 @@
+"""
+Adaptive admission control: AIMD limit changes, the bounded wait queue, and
+the 503 + Retry-After answer when a request is shed.
+"""
+
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.admission import AdaptiveLimiter, Rejected, limiters
+from src.middleware import register_middleware
+
+
+def make_limiter(initial_limit=4, min_limit=2, max_limit=5, queue_size=1, queue_timeout=1.0):
+    return AdaptiveLimiter("test", initial_limit=initial_limit, min_limit=min_limit, max_limit=max_limit,
+                           target_latency=0.1, queue_size=queue_size, queue_timeout=queue_timeout)
+
+
+def test_fast_requests_grow_the_limit_additively():
+    limiter = make_limiter()
+
+    async def main():
+        for _ in range(4):
+            await limiter.acquire()
+            limiter.release(latency=0.01)
+
+    asyncio.run(main())
+
+    # +1/limit per request: about +1 after `limit` requests
+    assert 4.9 < limiter.limit < 5.0
+
+
+def test_limit_stops_at_max_limit():
+    limiter = make_limiter(initial_limit=5)
+
+    async def main():
+        for _ in range(10):
+            await limiter.acquire()
+            limiter.release(latency=0.01)
+
+    asyncio.run(main())
+
+    assert limiter.limit == 5
+
+
+def test_slow_or_failed_requests_shrink_the_limit_multiplicatively(monkeypatch):
+    monkeypatch.setattr("src.admission.config.ADMISSION_BACKOFF", 0.5)
+    limiter = make_limiter(initial_limit=5)
+
+    async def main():
+        await limiter.acquire()
+        limiter.release(latency=1.0)
+        assert limiter.limit == 2.5
+        await limiter.acquire()
+        limiter.release(latency=0.01, failed=True)
+
+    asyncio.run(main())
+
+    # Never below min_limit
+    assert limiter.limit == 2
+
+
+def test_full_queue_is_rejected_and_released_slot_goes_to_the_waiter():
+    limiter = make_limiter(initial_limit=2, min_limit=2, queue_size=1)
+
+    async def main():
+        await limiter.acquire()
+        await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert len(limiter.waiters) == 1
+
+        with pytest.raises(Rejected) as rejected:
+            await limiter.acquire()
+        assert rejected.value.retry_after >= 1
+
+        limiter.release(latency=0.01)
+        await queued
+        return limiter.in_flight
+
+    # The slot was handed over, not freed
+    assert asyncio.run(main()) == 2
+
+
+def test_queued_request_times_out():
+    limiter = make_limiter(initial_limit=2, min_limit=2, queue_size=1, queue_timeout=0.01)
+    # Expected wait under the queue timeout: the request is queued, not rejected up front
+    limiter.avg_latency = 0.001
+
+    async def main():
+        await limiter.acquire()
+        await limiter.acquire()
+        with pytest.raises(Rejected):
+            await limiter.acquire()
+        return len(limiter.waiters), limiter.in_flight
+
+    assert asyncio.run(main()) == (0, 2)
+
+
+def test_shed_request_gets_503_with_retry_after(monkeypatch):
+    limiter = make_limiter(initial_limit=2, min_limit=2, queue_size=0)
+    limiter.in_flight = 2
+    monkeypatch.setitem(limiters, "read", limiter)
+
+    app = FastAPI()
+    register_middleware(app)
+
+    @app.get("/api/v1/book/")
+    async def books():
+        return []
+
+    response = TestClient(app).get("/api/v1/book/")
+
+    assert response.status_code == 503
+    assert response.json()["error_code"] == "server_overloaded"
+    assert int(response.headers["retry-after"]) >= 1
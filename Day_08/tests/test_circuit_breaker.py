@@ -0,0 +1,134 @@
+"""
+Circuit breaker state machine, and the Redis client that goes through it:
+a call that is never sent must not hold the half-open probe slot, and
+pipelines fail fast like single commands while the circuit is open.
+Uses fakeredis.
+"""
+
+import asyncio
+import time
+import fakeredis
+import pytest
+from redis.exceptions import TimeoutError as RedisTimeoutError
+from src import circuit_breaker, deadline
+from src.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from src.db import redis as redis_module
+from src.db.redis import CircuitOpenError, InstrumentedRedis
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def breaker(monkeypatch, clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=5)
+    monkeypatch.setattr(redis_module, "redis_breaker", breaker)
+    return breaker
+
+
+@pytest.fixture
+def client():
+    return InstrumentedRedis(connection_pool=fakeredis.FakeAsyncRedis().connection_pool)
+
+
+def open_breaker(breaker, clock):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+    clock.now += breaker.reset_timeout
+
+
+def test_closed_open_half_open_closed(breaker, clock):
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.now += breaker.reset_timeout
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_opens_the_circuit_again(breaker, clock):
+    open_breaker(breaker, clock)
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count(breaker):
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+
+    assert breaker.state == CLOSED
+
+
+def test_passed_deadline_does_not_take_the_probe_slot(breaker, clock, client):
+    open_breaker(breaker, clock)
+
+    async def late_request():
+        deadline.current_deadline.set(time.monotonic() - 1)
+        await client.get("key")
+
+    with pytest.raises(RedisTimeoutError):
+        asyncio.run(late_request())
+
+    assert breaker.state == OPEN and not breaker.probe_in_flight
+    # The next call is the probe, and closes the circuit
+    assert asyncio.run(client.get("key")) is None
+    assert breaker.state == CLOSED
+
+
+def test_pipeline_fails_fast_while_the_circuit_is_open(breaker, clock, client):
+    open_breaker(breaker, clock)
+    clock.now -= breaker.reset_timeout
+
+    async def main():
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.set("key", "value")
+            await pipe.execute()
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(main())
+
+
+def test_pipeline_counts_as_the_half_open_probe(breaker, clock, client):
+    open_breaker(breaker, clock)
+
+    async def main():
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.set("key", "value")
+            pipe.get("key")
+            return await pipe.execute()
+
+    assert asyncio.run(main()) == [True, b"value"]
+    assert breaker.state == CLOSED
@@ -0,0 +1,50 @@
+"""
+Compression middleware keeps the original headers and the compressed-variant
+cache stays within its byte budget.
+"""
+
+import gzip
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from src.compression import CompressedCache
+from src.middleware import register_middleware
+
+BODY = b'{"books": [' + b'{"title": "Dune"},' * 500 + b'{}]}'
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    register_middleware(app)
+
+    @app.get("/payload")
+    async def payload():
+        response = Response(content=BODY, media_type="application/json", headers={"Vary": "Origin"})
+        response.set_cookie("session", "abc")
+        response.set_cookie("theme", "dark")
+        return response
+
+    return TestClient(app)
+
+
+def test_compression_keeps_repeated_headers_and_appends_vary():
+    response = make_client().get("/payload", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers.get_list("set-cookie") == ["session=abc; Path=/; SameSite=lax",
+                                                       "theme=dark; Path=/; SameSite=lax"]
+    assert response.headers["vary"] == "Origin, Accept-Encoding"
+    assert response.content == BODY  # decoded by the client
+    assert int(response.headers["content-length"]) == len(gzip.compress(BODY, compresslevel=5))
+
+
+def test_compressed_cache_is_bounded_by_bytes():
+    cache = CompressedCache(max_bytes=100)
+    for index in range(10):
+        cache.set((bytes([index]), "gzip"), b"x" * 20)
+
+    assert cache.size == sum(len(value) for value in cache.entries.values()) <= 100
+    assert cache.get((bytes([9]), "gzip")) is not None
+    assert cache.get((bytes([0]), "gzip")) is None
+
+    cache.set((b"big", "gzip"), b"x" * 60)
+    assert cache.get((b"big", "gzip")) is None
@@ -0,0 +1,27 @@
+"""
+Requests cancelled at their deadline get a 504, and are counted per route
+template so uids in the path don't create a new metric series each.
+"""
+
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.deadline import DeadlineMiddleware, deadline_exceeded
+
+
+def test_deadline_exceeded_is_labelled_with_the_route_template():
+    app = FastAPI()
+
+    @app.get("/api/v1/book/{book_uid}")
+    async def get_book(book_uid: str):
+        await asyncio.sleep(1)
+
+    app.add_middleware(DeadlineMiddleware)
+    deadline_exceeded.values.clear()
+
+    with TestClient(app) as client:
+        for book_uid in ("a", "b"):
+            response = client.get(f"/api/v1/book/{book_uid}", headers={"X-Request-Timeout": "0.01"})
+            assert response.status_code == 504
+
+    assert dict(deadline_exceeded.values) == {("GET", "/api/v1/book/{book_uid}"): 2}
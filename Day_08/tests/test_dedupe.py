@@ -0,0 +1,72 @@
+"""
+Duplicate detection: normalized fingerprints, MinHash signatures, LSH
+bucketing and the union-find that groups duplicates under the oldest book.
+"""
+
+import numpy as np
+from src.books.dedupe import MinHasher, UnionFind, cluster
+from src.books.fingerprint import book_fingerprint, normalize
+
+BOOKS = [
+    "The Lord of the Rings J. R. R. Tolkien",
+    "Pride and Prejudice Jane Austen",
+    "The Lord of the Rings J.R.R. Tolkien",
+    "A Brief History of Time Stephen Hawking",
+    "the lord of the rings - j r r tolkien",
+    "Pride & Prejudice Jane Austen",
+]
+
+
+def signatures(texts, num_perm=64):
+    hasher = MinHasher(num_perm)
+    return np.vstack([hasher.signature(text) for text in texts])
+
+
+def test_normalize_and_fingerprint_ignore_case_accents_and_punctuation():
+    assert normalize("  Thé  Hobbit!! ") == "the hobbit"
+    assert (book_fingerprint("The Hobbit", "J.R.R. Tolkien", "Allen & Unwin")
+            == book_fingerprint("the hobbit", "J R R TOLKIEN", "Allen Unwin"))
+    assert book_fingerprint("The Hobbit", "Tolkien", "") != book_fingerprint("The Hobbit", "", "Tolkien")
+
+
+def test_signature_agreement_estimates_similarity():
+    matrix = signatures(["The Lord of the Rings Tolkien", "The Lord of the Rings Tolkien",
+                         "The Lord of the Ring Tolkien", "Pride and Prejudice Austen"])
+
+    assert (matrix[0] == matrix[1]).all()
+    assert (matrix[0] == matrix[2]).mean() > 0.6
+    assert (matrix[0] == matrix[3]).mean() < 0.2
+
+
+def test_union_find_keeps_the_oldest_book_as_root():
+    clusters = UnionFind(5)
+    clusters.union(4, 2)
+    clusters.union(2, 3)
+    clusters.union(3, 1)
+
+    assert [clusters.find(book) for book in range(5)] == [0, 1, 1, 1, 1]
+
+
+def test_cluster_groups_near_duplicates_under_the_first_book():
+    clusters = cluster(signatures(BOOKS), bands=16, threshold=0.8)
+
+    assert [clusters.find(book) for book in range(len(BOOKS))] == [0, 1, 0, 3, 0, 1]
+
+
+def test_cluster_needs_a_shared_band_and_the_threshold():
+    matrix = signatures(BOOKS)
+    # Same band values only in the first band: a candidate, but under the threshold
+    lookalike = np.arange(64, dtype=np.uint32) + 10**6
+    lookalike[:4] = matrix[0][:4]
+
+    clusters = cluster(np.vstack([matrix[:1], lookalike]), bands=16, threshold=0.8)
+    assert clusters.find(1) == 1
+
+    clusters = cluster(np.vstack([matrix[:1], lookalike]), bands=16, threshold=0.05)
+    assert clusters.find(1) == 0
+
+
+def test_cluster_handles_no_books():
+    clusters = cluster(np.empty((0, 64), dtype=np.uint32), bands=16, threshold=0.8)
+
+    assert len(clusters.parent) == 0
@@ -0,0 +1,62 @@
+"""
+Idempotency-Key: when the first execution on another worker fails without a
+stored response, exactly one of the waiting duplicates runs the handler again.
+Uses fakeredis (with lupa for Lua scripts).
+"""
+
+import asyncio
+import fakeredis
+import pytest
+from fastapi import Request, Response
+from src import idempotency
+from src.idempotency import idempotent
+
+LOCK_KEY = "idempotency:user-1:POST:/api/v1/book/:key-1:lock"
+
+
+def make_request() -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/api/v1/book/", "query_string": b"",
+                    "headers": [(b"idempotency-key", b"key-1")]})
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(idempotency.redis_manager, "client", client)
+    return client
+
+
+def test_only_one_waiter_reruns_after_the_owner_fails(redis):
+    calls = []
+
+    async def handler() -> Response:
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return Response(content=b"{}", status_code=201, media_type="application/json")
+
+    async def main():
+        # Another worker holds the lock and then dies without storing a response
+        await redis.set(LOCK_KEY, "other-worker")
+        waiters = [asyncio.create_task(idempotent(make_request(), "user-1", "fp", handler)) for _ in range(2)]
+        await asyncio.sleep(0.1)
+        await redis.delete(LOCK_KEY)
+        return await asyncio.gather(*waiters)
+
+    responses = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert sorted(response.status_code for response in responses) == [201, 201]
+    assert sum(response.headers.get("Idempotent-Replayed") == "true" for response in responses) == 1
+
+
+def test_owner_does_not_release_a_lock_taken_over_by_another_worker(redis):
+    async def handler() -> Response:
+        # Our lock expired meanwhile and another worker took it
+        await redis.set(LOCK_KEY, "other-worker")
+        return Response(content=b"{}", status_code=201, media_type="application/json")
+
+    async def main():
+        await idempotent(make_request(), "user-1", "fp", handler)
+        return await redis.get(LOCK_KEY)
+
+    assert asyncio.run(main()) == b"other-worker"
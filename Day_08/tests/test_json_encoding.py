@@ -0,0 +1,84 @@
+"""
+Rows fetched through asyncpg carry asyncpg's own UUID subclass, which plain
+orjson.dumps rejects — every hand-encoded response must go through dumps_json.
+"""
+
+import asyncio
+import uuid
+from collections import namedtuple
+from types import SimpleNamespace
+from datetime import date, datetime
+import orjson
+import pytest
+from asyncpg.pgproto import pgproto
+from src.books.fields import encode_book
+from src.books.repository import BookReadRepository, encode_rows
+from src.responses import BooklyJSONResponse, dumps_json
+from src.reviews.repository import encode_cursor, decode_cursor
+
+
+def asyncpg_uuid() -> uuid.UUID:
+    return pgproto.UUID(uuid.uuid4().bytes)
+
+
+def test_plain_orjson_rejects_asyncpg_uuid():
+    with pytest.raises(TypeError):
+        orjson.dumps(asyncpg_uuid())
+
+
+def test_encode_rows_accepts_asyncpg_uuid():
+    book_uid = asyncpg_uuid()
+    now = datetime(2024, 1, 1, 12, 0)
+    row = (book_uid, "Dune", "Frank Herbert", "Chilton", date(1965, 8, 1), 412, "en", now, now)
+
+    decoded = orjson.loads(encode_rows([row]))
+
+    assert decoded[0]["uid"] == str(book_uid)
+    assert decoded[0]["published_date"] == "1965-08-01"
+
+
+def test_dumps_json_still_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        dumps_json({"value": object()})
+
+
+def test_encode_book_sparse_fields_accepts_asyncpg_uuid():
+    review = SimpleNamespace(uid=asyncpg_uuid(), rating=4, review_text="Great", user_uid=asyncpg_uuid(),
+                             book_uid=asyncpg_uuid(), created_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 1))
+    book = SimpleNamespace(uid=asyncpg_uuid(), title="Dune", reviews=[review])
+
+    decoded = orjson.loads(encode_book(book, ("uid", "title", "reviews")))
+
+    assert decoded["uid"] == str(book.uid)
+    assert decoded["reviews"][0]["user_uid"] == str(review.user_uid)
+
+
+def test_review_cursor_round_trips_asyncpg_uuid():
+    row = {"rating": 3, "created_at": datetime(2024, 1, 1, 12, 30), "uid": asyncpg_uuid()}
+
+    cursor = encode_cursor("rating", row)
+
+    assert decode_cursor("rating", cursor) == (3, row["created_at"], uuid.UUID(str(row["uid"])))
+
+
+def test_json_response_renders_asyncpg_uuid_arrays():
+    # book_related.related_book_uids comes back as a list of asyncpg UUIDs
+    related = [asyncpg_uuid(), asyncpg_uuid()]
+
+    response = BooklyJSONResponse(content=[{"uid": uid, "score": 0.5} for uid in related])
+
+    assert orjson.loads(response.body) == [{"uid": str(uid), "score": 0.5} for uid in related]
+
+
+def test_suggest_json_accepts_asyncpg_uuid():
+    SuggestRow = namedtuple("SuggestRow", "uid title author distance")
+    book_uid = asyncpg_uuid()
+    rows = [SuggestRow(book_uid, "Dune", "Frank Herbert", 0.25), SuggestRow(book_uid, "Dune", "Frank Herbert", 0.5)]
+
+    class Session:
+        async def execute(self, statement, params):
+            return SimpleNamespace(all=lambda: rows)
+
+    suggestions = orjson.loads(asyncio.run(BookReadRepository().suggest_json("dun", 10, Session())))
+
+    assert suggestions == [{"uid": str(book_uid), "title": "Dune", "author": "Frank Herbert", "score": 0.75}]
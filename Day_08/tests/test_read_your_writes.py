@@ -0,0 +1,74 @@
+"""
+Read-your-writes: a writing commit marks the user before it commits, so the
+marker exists before the response is sent (not in dependency teardown).
+"""
+
+import asyncio
+from datetime import date
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+from src.db import main
+from src.db.model import Book, Review, User
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    events = []
+
+    async def mark_recent_write(user_uid, window):
+        events.append(("mark", user_uid))
+
+    monkeypatch.setattr(main, "mark_recent_write", mark_recent_write)
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all,
+                                tables=[User.__table__, Book.__table__, Review.__table__])
+
+    asyncio.run(create_tables())
+    factory = sessionmaker(engine, class_=main.PrimarySession, expire_on_commit=False)
+    yield factory, events
+    asyncio.run(engine.dispose())
+
+
+def run_session(factory, events, user_uid, write):
+    async def write_and_commit():
+        async with factory() as session:
+            event.listen(session.sync_session, "after_commit", lambda _: events.append(("commit",)))
+            session.info["ryw_user_uid"] = user_uid
+            write(session)
+            await session.commit()
+    asyncio.run(write_and_commit())
+
+
+def add_book(session):
+    session.add(Book(title="Dune", author="Frank Herbert", publisher="Chilton",
+                     published_date=date(1965, 8, 1), page_count=412, language="en"))
+
+
+def test_write_marks_user_before_commit(session_factory):
+    factory, events = session_factory
+
+    run_session(factory, events, "user-1", add_book)
+
+    assert events == [("mark", "user-1"), ("commit",)]
+
+
+def test_read_only_commit_does_not_mark(session_factory):
+    factory, events = session_factory
+
+    run_session(factory, events, "user-1", lambda session: None)
+
+    assert events == [("commit",)]
+
+
+def test_no_user_no_mark(session_factory):
+    factory, events = session_factory
+
+    run_session(factory, events, None, add_book)
+
+    assert events == [("commit",)]
@@ -0,0 +1,112 @@
+"""
+Review stream worker: an entry the database rejects does not hold back the
+rest of its batch, is retried until REVIEW_STREAM_MAX_DELIVERIES and then
+moved to the dead-letter stream. The database write is replaced by a fake
+that rejects NUL bytes the way PostgreSQL does. Uses fakeredis.
+"""
+
+import asyncio
+import fakeredis
+import pytest
+from sqlalchemy.exc import DBAPIError, OperationalError
+from src.reviews import ingest
+from src.reviews.ingest import ReviewStreamWorker
+
+STREAM = "reviews:test"
+DEAD_LETTER = "reviews:test:dead"
+
+
+class FakeDatabase:
+    def __init__(self) -> None:
+        self.written = []
+        self.down = False
+
+    async def write_batch(self, entries):
+        if self.down:
+            raise OperationalError("INSERT INTO reviews ...", {}, ConnectionRefusedError())
+        texts = [fields[b"review_text"] for _, fields in entries]
+        if any(b"\x00" in text for text in texts):
+            raise DBAPIError("INSERT INTO reviews ...", {}, Exception('invalid byte sequence for encoding "UTF8": 0x00'))
+        self.written.extend(texts)
+        return len(texts)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(ingest.redis_manager, "client", client)
+    monkeypatch.setattr(ingest.config, "REVIEW_STREAM_DEAD_LETTER", DEAD_LETTER)
+    monkeypatch.setattr(ingest.config, "REVIEW_STREAM_MAX_DELIVERIES", 2)
+    monkeypatch.setattr(ingest.config, "REVIEW_STREAM_CLAIM_IDLE_MS", 0)
+    return client
+
+
+@pytest.fixture
+def database():
+    return FakeDatabase()
+
+
+def make_worker(database):
+    worker = ReviewStreamWorker("test-consumer", stream=STREAM, group="test-group", batch_size=10)
+    worker.write_batch = database.write_batch
+    return worker
+
+
+async def enqueue(redis, texts):
+    for text in texts:
+        await redis.xadd(STREAM, {"user_uid": "u", "book_uid": "b", "rating": 5, "review_text": text})
+
+
+def test_bad_entry_does_not_hold_back_its_batch(redis, database):
+    worker = make_worker(database)
+
+    async def main():
+        await worker.ensure_group()
+        await enqueue(redis, ["one", "two", "bad\x00", "four", "five"])
+        await worker.run_once()
+        return await redis.xpending(STREAM, "test-group")
+
+    pending = asyncio.run(main())
+
+    assert sorted(database.written) == [b"five", b"four", b"one", b"two"]
+    # Retried later, not dead-lettered on its first delivery
+    assert pending["pending"] == 1
+
+
+def test_bad_entry_is_dead_lettered_after_max_deliveries(redis, database):
+    worker = make_worker(database)
+
+    async def main():
+        await worker.ensure_group()
+        await enqueue(redis, ["good", "bad\x00"])
+        await worker.run_once()
+        # XAUTOCLAIM delivers it a second time
+        await worker.run_once()
+        return (await redis.xpending(STREAM, "test-group"),
+                await redis.xrange(DEAD_LETTER))
+
+    pending, dead_letters = asyncio.run(main())
+
+    assert database.written == [b"good"]
+    assert pending["pending"] == 0
+    assert len(dead_letters) == 1
+    fields = dead_letters[0][1]
+    assert fields[b"review_text"] == b"bad\x00"
+    assert b"invalid byte sequence" in fields[b"error"]
+
+
+def test_unavailable_database_leaves_everything_pending(redis, database):
+    worker = make_worker(database)
+    database.down = True
+
+    async def main():
+        await worker.ensure_group()
+        await enqueue(redis, ["one", "two"])
+        with pytest.raises(OperationalError):
+            await worker.run_once()
+        return await redis.xpending(STREAM, "test-group"), await redis.exists(DEAD_LETTER)
+
+    pending, dead_letter_exists = asyncio.run(main())
+
+    assert pending["pending"] == 2
+    assert dead_letter_exists == 0
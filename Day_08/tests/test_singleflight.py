@@ -0,0 +1,58 @@
+"""
+Single-flight: the shared call is independent of the leader's request deadline,
+and the cross-worker Redis lock is only ever released by its owner.
+Uses fakeredis (with lupa for Lua scripts).
+"""
+
+import asyncio
+import fakeredis
+import pytest
+from src import deadline, singleflight
+from src.singleflight import SingleFlight
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(singleflight.redis_manager, "client", client)
+    monkeypatch.setattr(singleflight.config, "SINGLEFLIGHT_REDIS_LOCK_MS", 1000)
+    return client
+
+
+def test_shared_call_does_not_inherit_the_leader_deadline():
+    seen = []
+
+    async def load():
+        seen.append(deadline.remaining())
+        return b"book"
+
+    async def main():
+        deadline.current_deadline.set(asyncio.get_running_loop().time() + 0.005)
+        return await SingleFlight("test").do("key", load)
+
+    assert asyncio.run(main()) == b"book"
+    assert seen == [None]
+
+
+def test_leader_does_not_release_a_lock_it_no_longer_owns(redis):
+    flight = SingleFlight("test")
+    lock_key = "singleflight:test:key:lock"
+
+    async def slow_load():
+        # The leader's lock expired and another worker took it meanwhile
+        await redis.set(lock_key, "other-worker")
+        return b"book"
+
+    async def main():
+        result = await flight.do("key", slow_load)
+        return result, await redis.get(lock_key)
+
+    assert asyncio.run(main()) == (b"book", b"other-worker")
+
+
+def test_leader_releases_its_own_lock(redis):
+    async def main():
+        await SingleFlight("test").do("key", lambda: asyncio.sleep(0, b"book"))
+        return await redis.exists("singleflight:test:key:lock")
+
+    assert asyncio.run(main()) == 0
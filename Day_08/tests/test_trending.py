@@ -0,0 +1,53 @@
+"""
+Trending job lock: one run at a time, and a run that outlived the lock's TTL
+does not release the next run's lock. Uses fakeredis (with lupa for Lua scripts).
+"""
+
+import asyncio
+import fakeredis
+from src.books.trending import TrendingJob, LOCK_KEY
+
+
+def test_run_is_skipped_while_another_holds_the_lock():
+    redis = fakeredis.FakeAsyncRedis()
+    job = TrendingJob(redis)
+
+    async def main():
+        await redis.set(LOCK_KEY, "other-run")
+        return await job.run(session=None)
+
+    assert asyncio.run(main()) == 0
+
+
+def test_run_does_not_release_a_lock_it_no_longer_owns():
+    redis = fakeredis.FakeAsyncRedis()
+    job = TrendingJob(redis)
+
+    async def slow_run(session):
+        # This run's lock expired and the next run took it meanwhile
+        await redis.set(LOCK_KEY, "next-run")
+        return 1
+
+    job._run = slow_run
+
+    async def main():
+        await job.run(session=None)
+        return await redis.get(LOCK_KEY)
+
+    assert asyncio.run(main()) == b"next-run"
+
+
+def test_run_releases_its_own_lock():
+    redis = fakeredis.FakeAsyncRedis()
+    job = TrendingJob(redis)
+
+    async def quick_run(session):
+        return 1
+
+    job._run = quick_run
+
+    async def main():
+        assert await job.run(session=None) == 1
+        return await redis.exists(LOCK_KEY)
+
+    assert asyncio.run(main()) == 0
@@ -0,0 +1,101 @@
+"""
+Writes return their server-filled columns with INSERT/UPDATE ... RETURNING
+instead of a refresh SELECT afterwards. Statements are counted with a
+`before_cursor_execute` listener on an in-memory SQLite database (aiosqlite),
+which supports RETURNING like PostgreSQL.
+"""
+
+import asyncio
+from datetime import datetime
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.auth.schemas import UserCreation
+from src.auth.service import UserService
+from src.books.schema import BookCreateModel, BookUpdate
+from src.books.service import BookService
+from src.db.model import Book, Review, User
+
+
+@pytest.fixture
+def database():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            # SQLite has no ARRAY columns: only the tables these writes touch
+            await conn.run_sync(SQLModel.metadata.create_all,
+                                tables=[User.__table__, Book.__table__, Review.__table__])
+
+    asyncio.run(create_tables())
+    statements.clear()
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False), statements
+    asyncio.run(engine.dispose())
+
+
+def run(session_factory, write):
+    async def main():
+        async with session_factory() as session:
+            return await write(session)
+    return asyncio.run(main())
+
+
+def create_user(session):
+    user_data = UserCreation(first_name="Ada", last_name="Lovelace", username="ada",
+                             email="ada@example.com", password="secret")
+    return UserService().create_user(user_data, session)
+
+
+def create_book(user_uid):
+    book_data = BookCreateModel(title="Dune", author="Frank Herbert", publisher="Chilton",
+                                published_date="1965-08-01", page_count=412, language="en")
+    return lambda session: BookService().create_book(book_data, user_uid, session)
+
+
+def test_create_user_is_one_insert_returning(database):
+    session_factory, statements = database
+
+    user = run(session_factory, create_user)
+
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO users") and "RETURNING" in statements[0]
+    assert isinstance(user.created_at, datetime)
+
+
+def test_create_book_has_no_select_after_insert(database):
+    session_factory, statements = database
+    user = run(session_factory, create_user)
+    statements.clear()
+
+    book = run(session_factory, create_book(user.uid))
+
+    inserts = [index for index, statement in enumerate(statements) if statement.startswith("INSERT")]
+    assert len(inserts) == 1
+    assert statements[inserts[0]].startswith("INSERT INTO books") and "RETURNING" in statements[inserts[0]]
+    # Only the duplicate (fingerprint) lookup comes before it, nothing after it
+    assert statements[inserts[0] + 1:] == []
+    assert isinstance(book.created_at, datetime) and isinstance(book.updated_at, datetime)
+
+
+def test_update_book_has_no_select_after_update(database):
+    session_factory, statements = database
+    user = run(session_factory, create_user)
+    book = run(session_factory, create_book(user.uid))
+    statements.clear()
+
+    update_data = BookUpdate(title="Dune Messiah", publisher="Putnam", page_count=256, language="en")
+    updated = run(session_factory, lambda session: BookService().update_book(book.uid, update_data, session))
+
+    updates = [index for index, statement in enumerate(statements) if statement.startswith("UPDATE")]
+    assert len(updates) == 1
+    assert "RETURNING" in statements[updates[0]]
+    assert statements[updates[0] + 1:] == []
+    assert updated.title == "Dune Messiah" and isinstance(updated.updated_at, datetime)